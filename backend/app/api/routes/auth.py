@@ -1,27 +1,87 @@
+import math
+
 from core.config import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     ADMIN_PASSWORD_HASH,
     ADMIN_USERNAME,
+    LOGIN_IP_BURST,
+    LOGIN_IP_RATE_PER_MINUTE,
+    LOGIN_USER_BURST,
+    LOGIN_USER_RATE_PER_MINUTE,
 )
-from fastapi import APIRouter, Depends, HTTPException
+from core.metrics import Counter
+from core.ratelimit import TokenBucketLimiter, client_ip
+from core.security import PasswordCheckBusy
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
 from fastapi.security import OAuth2PasswordRequestForm
-from services.auth import authenticate, create_token
+from pydantic import BaseModel
+from services.auth import aauthenticate, create_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+LOGIN_ATTEMPTS = Counter(
+    "auth_login_attempts_total",
+    "Login attempts by outcome (ok, invalid, throttled, busy).",
+    ("outcome",),
+)
 
-@router.post("/login")
-def login(form: OAuth2PasswordRequestForm = Depends()):
-    ok = authenticate(
-        form.username,
-        form.password,
-        ADMIN_USERNAME,
-        ADMIN_PASSWORD_HASH,
-    )
+# Checked before any hashing, so a flood costs almost nothing
+ip_limiter = TokenBucketLimiter(
+    rate=LOGIN_IP_RATE_PER_MINUTE / 60, burst=LOGIN_IP_BURST
+)
+user_limiter = TokenBucketLimiter(
+    rate=LOGIN_USER_RATE_PER_MINUTE / 60, burst=LOGIN_USER_BURST
+)
+
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
+
+def _throttle(request: Request, username: str):
+    ip = client_ip(request)
+    wait = max(ip_limiter.take(ip), user_limiter.take(username.lower()))
+    if wait > 0:
+        LOGIN_ATTEMPTS.inc(("throttled",))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
+@router.post("/login", response_model=Token)
+async def login(request: Request, form: OAuth2PasswordRequestForm = Depends()):
+    _throttle(request, form.username)
+
+    try:
+        ok = await aauthenticate(
+            form.username,
+            form.password,
+            ADMIN_USERNAME,
+            ADMIN_PASSWORD_HASH,
+        )
+    except PasswordCheckBusy:
+        LOGIN_ATTEMPTS.inc(("busy",))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login is busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
 
     if not ok:
+        LOGIN_ATTEMPTS.inc(("invalid",))
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    LOGIN_ATTEMPTS.inc(("ok",))
+    # A successful login clears the earlier failures for this client
+    ip_limiter.reset(client_ip(request))
+    user_limiter.reset(form.username.lower())
     token = create_token({"sub": form.username}, ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    return {"access_token": token, "token_type": "bearer"}
+    return Response(
+        content=Token(access_token=token).model_dump_json(),
+        media_type="application/json",
+    )
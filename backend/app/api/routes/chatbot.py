@@ -3,28 +3,224 @@ Chatbot API Router
 Provides endpoints for chatbot functionality
 """
 
-from typing import List, Optional
+import asyncio
+import json
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from api.deps import get_current_admin
 
 # Import the validated constants from your new config
-from core.config import GEMINI_API_KEY, PUSHOVER_TOKEN, PUSHOVER_USER
-from fastapi import APIRouter, Depends, HTTPException
+from core.config import (
+    CHAT_CACHE_MAX_ENTRIES,
+    CHAT_CACHE_MAX_HISTORY,
+    CHAT_CACHE_TTL_SECONDS,
+    CHAT_CONTEXT_ARTIFACT,
+    CHAT_CONTEXT_CHECK_SECONDS,
+    CHAT_HISTORY_SUMMARY_TOKENS,
+    CHAT_HISTORY_TOKEN_BUDGET,
+    CHAT_IP_BURST,
+    CHAT_IP_RATE_PER_MINUTE,
+    CHAT_MAX_CONCURRENT,
+    CHAT_MAX_QUEUE,
+    CHAT_MAX_TOOL_ROUNDS,
+    CHAT_QUEUE_TIMEOUT_SECONDS,
+    CHAT_SESSION_BACKEND,
+    CHAT_SESSION_MAX_MESSAGES,
+    CHAT_SESSION_MAX_SESSIONS,
+    CHAT_SESSION_SQLITE_PATH,
+    CHAT_SESSION_TTL_SECONDS,
+    CHAT_TOOL_TIMEOUT_SECONDS,
+    CHAT_TURN_DEADLINE_SECONDS,
+    CONTACT_IP_BURST,
+    CONTACT_IP_RATE_PER_MINUTE,
+    GEMINI_API_KEY,
+    GEMINI_API_KEYS,
+    GEMINI_BASE_URL,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET_SECONDS,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_FALLBACK_MODEL,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_MODEL,
+    LLM_PROVIDER,
+    LLM_REQUEST_TIMEOUT_SECONDS,
+    LLM_RETRY_BACKOFF_MAX_SECONDS,
+    LLM_RETRY_BACKOFF_SECONDS,
+    PUSHOVER_API_URL,
+    PUSHOVER_TOKEN,
+    PUSHOVER_USER,
+    RETRIEVAL_TOP_K,
+)
+from core.metrics import Counter, Gauge
+from core.ratelimit import (
+    ConcurrencyLimiter,
+    Overloaded,
+    TokenBucketLimiter,
+    client_ip,
+)
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, EmailStr
-from services.chatbot_service import ChatbotService
+from services.chat_sessions import create_session_store, new_session_id
+from services.chatbot_service import ChatbotService, ChatTurnFailed
+from services.history import HistoryCompactor
+from services.llm import create_llm_router
+from services.notifications import NotificationDispatcher
+from services.response_cache import ResponseCache
 
 router = APIRouter(prefix="/api/v1/chatbot", tags=["chatbot"])
 
+CHAT_ADMISSION = Counter(
+    "chatbot_admission_total",
+    "Chatbot requests by endpoint and outcome (admitted, throttled, overloaded).",
+    ("endpoint", "outcome"),
+)
+
+# Per-client buckets stop one scraper early; the concurrency cap protects
+# upstream quota and latency for everyone else
+chat_ip_limiter = TokenBucketLimiter(
+    rate=CHAT_IP_RATE_PER_MINUTE / 60, burst=CHAT_IP_BURST
+)
+contact_ip_limiter = TokenBucketLimiter(
+    rate=CONTACT_IP_RATE_PER_MINUTE / 60, burst=CONTACT_IP_BURST
+)
+chat_admission = ConcurrencyLimiter(
+    CHAT_MAX_CONCURRENT, CHAT_MAX_QUEUE, CHAT_QUEUE_TIMEOUT_SECONDS
+)
+
+Gauge(
+    "chatbot_admission_slots",
+    "Chat turns holding a slot (active) or waiting for one (queued).",
+    ("state",),
+    lambda: [
+        (("active",), chat_admission.active),
+        (("queued",), chat_admission.queued),
+    ],
+)
+
 
 # Initialize chatbot service
-def get_chatbot_service() -> ChatbotService:
-    """Dependency to get chatbot service instance using validated config"""
+def create_chatbot_service(
+    notifier: Optional[NotificationDispatcher] = None,
+) -> ChatbotService:
+    """Build the chatbot service using validated config (called once per process)"""
     # We use the imported constants which are guaranteed strings by config.py
     return ChatbotService(
         gemini_api_key=GEMINI_API_KEY,
         pushover_user=PUSHOVER_USER,
         pushover_token=PUSHOVER_TOKEN,
+        notifier=notifier,
+        retrieval_top_k=RETRIEVAL_TOP_K,
+        response_cache=ResponseCache(
+            max_entries=CHAT_CACHE_MAX_ENTRIES, ttl_seconds=CHAT_CACHE_TTL_SECONDS
+        ),
+        cache_max_history=CHAT_CACHE_MAX_HISTORY,
+        history_compactor=HistoryCompactor(
+            budget_tokens=CHAT_HISTORY_TOKEN_BUDGET,
+            summary_tokens=CHAT_HISTORY_SUMMARY_TOKENS,
+        ),
+        base_url=GEMINI_BASE_URL,
+        pushover_url=PUSHOVER_API_URL,
+        context_artifact=CHAT_CONTEXT_ARTIFACT,
+        context_check_interval=CHAT_CONTEXT_CHECK_SECONDS,
+        tool_timeout=CHAT_TOOL_TIMEOUT_SECONDS,
+        max_tool_rounds=CHAT_MAX_TOOL_ROUNDS,
+        turn_deadline=CHAT_TURN_DEADLINE_SECONDS,
+        llm=create_llm_router(
+            LLM_PROVIDER,
+            GEMINI_API_KEYS,
+            GEMINI_BASE_URL,
+            LLM_MODEL,
+            fallback_model=LLM_FALLBACK_MODEL,
+            request_timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+            connect_timeout=LLM_CONNECT_TIMEOUT_SECONDS,
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_retries=LLM_MAX_RETRIES,
+            backoff_base=LLM_RETRY_BACKOFF_SECONDS,
+            backoff_max=LLM_RETRY_BACKOFF_MAX_SECONDS,
+            breaker_failures=LLM_BREAKER_FAILURES,
+            breaker_reset_seconds=LLM_BREAKER_RESET_SECONDS,
+        ),
+    )
+
+
+def create_chat_sessions():
+    """Session store for server-side history (one per process)"""
+    return create_session_store(
+        CHAT_SESSION_BACKEND,
+        sqlite_path=CHAT_SESSION_SQLITE_PATH,
+        max_sessions=CHAT_SESSION_MAX_SESSIONS,
+        ttl_seconds=CHAT_SESSION_TTL_SECONDS,
+        max_messages=CHAT_SESSION_MAX_MESSAGES,
+    )
+
+
+def get_chat_sessions(request: Request):
+    sessions = getattr(request.app.state, "chat_sessions", None)
+    if sessions is None:
+        sessions = create_chat_sessions()
+        request.app.state.chat_sessions = sessions
+    return sessions
+
+
+def _too_many(endpoint: str, outcome: str, wait: float, detail: str):
+    CHAT_ADMISSION.inc((endpoint, outcome))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(math.ceil(wait))},
     )
 
 
+def limit_chat_client(request: Request):
+    """Dependency: per-IP token bucket for the chat endpoints (see client_ip)"""
+    wait = chat_ip_limiter.take(client_ip(request))
+    if wait > 0:
+        raise _too_many("chat", "throttled", wait, "Too many chat messages")
+
+
+def limit_contact_client(request: Request):
+    """Dependency: per-IP token bucket for the contact form"""
+    wait = contact_ip_limiter.take(client_ip(request))
+    if wait > 0:
+        raise _too_many("contact", "throttled", wait, "Too many contact requests")
+
+
+async def _admit(endpoint: str):
+    """Take a chat slot, waiting in the bounded queue; 429 once it is full"""
+    try:
+        await chat_admission.acquire()
+    except Overloaded as e:
+        raise _too_many(endpoint, "overloaded", e.retry_after, "Chatbot is busy")
+    CHAT_ADMISSION.inc((endpoint, "admitted"))
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """Gives the admission slot back however the stream ends, even unstarted"""
+
+    def __init__(self, *args, release, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+def get_chatbot_service(request: Request) -> ChatbotService:
+    """Dependency returning the shared service created in the app lifespan"""
+    chatbot = getattr(request.app.state, "chatbot", None)
+    if chatbot is None:
+        chatbot = create_chatbot_service()
+        request.app.state.chatbot = chatbot
+    return chatbot
+
+
 # Request/Response models
 class Message(BaseModel):
     role: str  # "user" or "assistant"
@@ -35,11 +231,17 @@ class ChatRequest(BaseModel):
     message: str
     # Fixed the type hint error by removing Optional and defaulting to []
     history: List[Message] = []
+    # Session mode: set new_session on the first turn (history, if any, seeds
+    # it), then send only the message and the returned session_id
+    session_id: Optional[str] = None
+    new_session: bool = False
 
 
 class ChatResponse(BaseModel):
     response: str
-    model: str = "gemini-2.5-flash"
+    # The model that answered: the primary, or the fallback when it stood in
+    model: str
+    session_id: Optional[str] = None
 
 
 class ContactRequest(BaseModel):
@@ -48,27 +250,114 @@ class ContactRequest(BaseModel):
     message: Optional[str] = None
 
 
+async def _resolve_history(
+    request: ChatRequest, sessions
+) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    """(session_id, history) for a stateless, new-session or continuing turn"""
+    if request.session_id:
+        stored = await sessions.aload(request.session_id)
+        if stored is None:
+            raise HTTPException(
+                status_code=404, detail="Chat session not found or expired"
+            )
+        return request.session_id, stored
+
+    # Pydantic v2 uses .model_dump() instead of .dict()
+    history_dicts = [msg.model_dump() for msg in request.history]
+    if not request.new_session:
+        return None, history_dicts
+
+    session_id = new_session_id()
+    if history_dicts:
+        await sessions.aappend(session_id, history_dicts)
+    return session_id, history_dicts
+
+
+def _turn(message: str, answer: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": answer},
+    ]
+
+
 # Endpoints
-@router.post("/chat", response_model=ChatResponse)
+@router.post(
+    "/chat", response_model=ChatResponse, dependencies=[Depends(limit_chat_client)]
+)
 async def chat(
-    request: ChatRequest, chatbot: ChatbotService = Depends(get_chatbot_service)
+    request: ChatRequest,
+    chatbot: ChatbotService = Depends(get_chatbot_service),
+    sessions=Depends(get_chat_sessions),
 ):
     """
     Chat with the AI assistant
     """
+    session_id, history = await _resolve_history(request, sessions)
+    await _admit("chat")
+    started = time.monotonic()
     try:
-        # Pydantic v2 uses .model_dump() instead of .dict()
-        history_dicts = [msg.model_dump() for msg in request.history]
-
-        response = chatbot.chat(message=request.message, history=history_dicts)
+        try:
+            answer = await chatbot.achat(message=request.message, history=history)
+            response, model = answer.text, answer.model
+        except ChatTurnFailed as e:
+            # Shown to the user but kept out of the session, so a retry
+            # isn't answered with the failure as context
+            response, model = e.reply, chatbot.model_name
+        else:
+            if session_id:
+                await sessions.aappend(session_id, _turn(request.message, response))
 
-        return ChatResponse(response=response)
+        # Serialized here by pydantic-core, skipping FastAPI's re-validation
+        # and jsonable_encoder pass over the returned model
+        body = ChatResponse(response=response, model=model, session_id=session_id)
+        return Response(content=body.model_dump_json(), media_type="application/json")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+    finally:
+        chat_admission.release(time.monotonic() - started)
+
 
+@router.post("/chat/stream", dependencies=[Depends(limit_chat_client)])
+async def chat_stream(
+    request: ChatRequest,
+    chatbot: ChatbotService = Depends(get_chatbot_service),
+    sessions=Depends(get_chat_sessions),
+):
+    """
+    Chat with the AI assistant, streaming tokens back as Server-Sent Events
+    """
+    session_id, history = await _resolve_history(request, sessions)
+    # Admitted before the response starts so a full queue is a real 429;
+    # the slot is held until the stream ends
+    await _admit("stream")
+    started = time.monotonic()
 
-@router.post("/contact")
+    async def event_source():
+        if session_id:
+            yield f"event: session\ndata: {json.dumps({'session_id': session_id})}\n\n"
+        parts: List[str] = []
+        async for item in chatbot.astream_chat(
+            message=request.message, history=history
+        ):
+            if item["event"] == "delta":
+                parts.append(item["data"].get("content", ""))
+            elif item["event"] == "done" and session_id:
+                await sessions.aappend(
+                    session_id, _turn(request.message, "".join(parts))
+                )
+            payload = json.dumps(item["data"], ensure_ascii=False)
+            yield f"event: {item['event']}\ndata: {payload}\n\n"
+
+    return _AdmittedStreamingResponse(
+        event_source(),
+        release=lambda: chat_admission.release(time.monotonic() - started),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/contact", dependencies=[Depends(limit_contact_client)])
 async def record_contact(
     request: ContactRequest, chatbot: ChatbotService = Depends(get_chatbot_service)
 ):
@@ -91,14 +380,40 @@ async def record_contact(
         )
 
 
+@router.delete("/sessions/{session_id}", status_code=204)
+async def end_session(session_id: str, sessions=Depends(get_chat_sessions)):
+    """Forget a conversation's server-side history"""
+    if not await sessions.adelete(session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+
+
+@router.post("/reload", dependencies=[Depends(get_current_admin)])
+async def reload_context(chatbot: ChatbotService = Depends(get_chatbot_service)):
+    """
+    Force a re-read of the resume and summary (admin only)
+    """
+    # Re-parsing the PDF is blocking work; keep it off the event loop
+    await asyncio.to_thread(chatbot.refresh_context, True)
+    return {"reloaded": True, "prompt_version": chatbot.prompt_version}
+
+
 @router.get("/health")
-async def chatbot_health():
+async def chatbot_health(
+    chatbot: ChatbotService = Depends(get_chatbot_service),
+    sessions=Depends(get_chat_sessions),
+):
     """Check if chatbot service is available using the central config"""
     if not GEMINI_API_KEY:
         return {"status": "unhealthy", "message": "GEMINI_API_KEY not configured"}
 
     return {
         "status": "healthy",
-        "model": "gemini-2.0-flash-exp",
+        "model": chatbot.model_name,
+        "llm_routes": chatbot.llm.stats(),
         "features": ["chat", "contact_recording", "push_notifications"],
+        "response_cache": (
+            chatbot.response_cache.stats() if chatbot.response_cache else None
+        ),
+        "sessions": await sessions.astats(),
+        "admission": chat_admission.stats(),
     }
@@ -1,32 +1,114 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Literal
+
 from api.deps import get_current_admin
+from core.config import PROJECT_BATCH_MAX_ITEMS, PROJECT_IMPORT_CHUNK_SIZE
+from core.singleflight import SingleFlight
 from crud.project import (
-    create_project,
-    delete_project,
-    get_project,
-    get_projects,
-    update_project,
+    acreate_project,
+    adelete_project,
+    adelete_projects,
+    aget_project,
+    aget_project_summaries,
+    aimport_projects,
+    aiter_projects,
+    aupdate_project,
+    aupdate_projects,
+)
+from crud.search import asearch_projects
+from crud.tag import aget_tag_counts, normalize_tag
+from db.session import AsyncSessionLocal
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
 )
-from db.session import SessionLocal
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from schemas.project import (
+    ProjectBatchDelete,
+    ProjectBatchDeleteResult,
+    ProjectBatchUpdate,
+    ProjectBatchUpdateResult,
     ProjectCreate,
+    ProjectImport,
+    ProjectImportResult,
     ProjectResponse,
+    ProjectSearchResult,
+    ProjectSummary,
     ProjectUpdate,
+    TagCount,
 )
-from sqlalchemy.orm import Session
+from services.project_cache import project_cache
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+_summary_list = TypeAdapter(list[ProjectSummary])
+_tag_list = TypeAdapter(list[TagCount])
+
+# Cache misses for the same key and version that arrive together (a shared
+# link) run one query; each load opens its own session so it can outlive
+# the request that started it
+_loads = SingleFlight("projects")
+
+
+# --------------------------------------------------
+# CONDITIONAL GET HELPERS
+# --------------------------------------------------
+def _cache_entry(body: bytes, modified_at: float, **extra) -> dict:
+    """Serialized body plus the validators sent with it"""
+    return {
+        "body": body,
+        "etag": '"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        "last_modified": formatdate(modified_at, usegmt=True),
+        "modified_at": int(modified_at),
+        **extra,
+    }
+
+
+def _not_modified(request: Request, entry: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry["etag"] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return entry["modified_at"] <= since
+    return False
+
+
+def _json_response(request: Request, entry: dict, headers: dict | None = None):
+    headers = {
+        **(headers or {}),
+        "ETag": entry["etag"],
+        "Last-Modified": entry["last_modified"],
+        # Let browsers keep a copy but revalidate it on every use
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(request, entry):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=entry["body"], media_type="application/json", headers=headers
+    )
+
 
 # --------------------------------------------------
 # DATABASE DEPENDENCY
 # --------------------------------------------------
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 # --------------------------------------------------
@@ -38,46 +120,262 @@ def get_db():
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(get_current_admin)],
 )
-def add_project(
+async def add_project(
     project: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Creates a new project with basic info.
     Matches Pydantic ProjectCreate (uses short_description).
     """
-    return create_project(db, project)
+    return await acreate_project(db, project)
+
+
+# --------------------------------------------------
+# LIST PROJECTS (PAGINATED SUMMARIES)
+# --------------------------------------------------
+@router.get("/", response_model=list[ProjectSummary])
+async def list_projects(
+    request: Request,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+    tag: list[str] = Query([]),
+    match: Literal["all", "any"] = "all",
+):
+    """
+    Fetches one page of project summaries from Neon, newest first.
+    Long-text fields are only served by GET /projects/{id}.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    Repeat ?tag= to filter by tech stack; match=all (default) or any.
+    Supports If-None-Match / If-Modified-Since (304 without a DB query).
+    """
+    tags = tuple(sorted({normalize_tag(t) for t in tag if t.strip()}))
 
+    # Read-through: cached bytes are tagged with the catalog version seen
+    # before the query, so an admin write in between invalidates them.
+    key = ("list", limit, cursor, tags, match if len(tags) > 1 else "all")
+    version = project_cache.list_version()
+    modified_at = project_cache.catalog_modified_at
+    cached = project_cache.get(key, version)
 
+    async def load() -> dict:
+        async with AsyncSessionLocal() as db:
+            try:
+                rows, next_cursor = await aget_project_summaries(
+                    db, limit=limit, cursor=cursor, tags=list(tags), match=match
+                )
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                )
+            summaries = _summary_list.validate_python(rows, from_attributes=True)
+        entry = _cache_entry(
+            _summary_list.dump_json(summaries), modified_at, next_cursor=next_cursor
+        )
+        project_cache.set(key, version, entry)
+        return entry
+
+    if cached is None:
+        cached, _ = await _loads.do((key, version), load)
+
+    next_cursor = cached["next_cursor"]
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return _json_response(request, cached, headers)
+
+
+# --------------------------------------------------
+# TECH-STACK TAGS
 # --------------------------------------------------
-# LIST ALL PROJECTS
+@router.get("/tags", response_model=list[TagCount])
+async def list_tags(request: Request):
+    """Every tech-stack tag in use with its project count, most used first"""
+    key = ("tags",)
+    version = project_cache.list_version()
+    modified_at = project_cache.catalog_modified_at
+    cached = project_cache.get(key, version)
+
+    async def load() -> dict:
+        async with AsyncSessionLocal() as db:
+            rows = await aget_tag_counts(db)
+            counts = _tag_list.validate_python(rows, from_attributes=True)
+        entry = _cache_entry(_tag_list.dump_json(counts), modified_at)
+        project_cache.set(key, version, entry)
+        return entry
+
+    if cached is None:
+        cached, _ = await _loads.do((key, version), load)
+
+    return _json_response(request, cached)
+
+
 # --------------------------------------------------
-@router.get("/", response_model=list[ProjectResponse])
-def list_projects(
-    db: Session = Depends(get_db),
+# FULL-TEXT SEARCH
+# --------------------------------------------------
+@router.get("/search", response_model=list[ProjectSearchResult])
+async def search_projects(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Fetches all projects from Neon."""
-    return get_projects(db)
+    """
+    Ranked full-text search over titles, descriptions, tech stack and the
+    long-form write-ups. Snippets highlight matches with <mark> tags.
+    """
+    return await asearch_projects(db, q, limit=limit)
+
+
+# --------------------------------------------------
+# BULK EXPORT / IMPORT (NDJSON)
+# --------------------------------------------------
+@router.get("/export", dependencies=[Depends(get_current_admin)])
+async def export_projects():
+    """Streams every project, full record per line, in id order"""
+
+    async def lines():
+        # Own session: the response body outlives the request dependencies
+        async with AsyncSessionLocal() as db:
+            async for page in aiter_projects(db, PROJECT_IMPORT_CHUNK_SIZE):
+                yield b"".join(
+                    ProjectResponse.model_validate(p).model_dump_json().encode() + b"\n"
+                    for p in page
+                )
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="projects.ndjson"'},
+    )
+
+
+async def _ndjson_records(request: Request):
+    """Parse the request body line by line as it arrives"""
+    buffer = b""
+    line_no = 0
+
+    def parse(line: bytes):
+        try:
+            return ProjectImport.model_validate_json(line)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail={"line": line_no, "errors": e.errors(include_url=False)},
+            )
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield parse(line)
+    if buffer.strip():
+        line_no += 1
+        yield parse(buffer)
+
+
+@router.post(
+    "/import",
+    response_model=ProjectImportResult,
+    dependencies=[Depends(get_current_admin)],
+)
+async def import_projects(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Body: NDJSON, one project per line (the export format). Lines with an
+    id upsert that project, others are inserted. Rows are written in bulk
+    chunks inside a single transaction; any invalid line aborts the import.
+    """
+    imported, chunks = await aimport_projects(
+        db, _ndjson_records(request), chunk_size=PROJECT_IMPORT_CHUNK_SIZE
+    )
+    return {"imported": imported, "chunks": chunks}
+
+
+# --------------------------------------------------
+# BATCH UPDATE / DELETE
+# --------------------------------------------------
+def _check_batch_size(count: int):
+    if count > PROJECT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {PROJECT_BATCH_MAX_ITEMS} items per batch",
+        )
+
+
+@router.patch(
+    "/batch",
+    response_model=ProjectBatchUpdateResult,
+    dependencies=[Depends(get_current_admin)],
+)
+async def edit_projects(
+    updates: list[ProjectBatchUpdate],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Partial updates for many projects in one transaction: one
+    UPDATE ... RETURNING per distinct set of changed fields
+    """
+    _check_batch_size(len(updates))
+    updated, missing = await aupdate_projects(db, updates)
+    return {"updated": updated, "missing": missing}
+
+
+@router.delete(
+    "/batch",
+    response_model=ProjectBatchDeleteResult,
+    dependencies=[Depends(get_current_admin)],
+)
+async def remove_projects(
+    batch: ProjectBatchDelete,
+    db: AsyncSession = Depends(get_db),
+):
+    """Deletes many projects in one transaction (DELETE ... RETURNING)"""
+    _check_batch_size(len(batch.ids))
+    deleted, missing = await adelete_projects(db, batch.ids)
+    return {"deleted": deleted, "missing": missing}
+
+
+# --------------------------------------------------
+# CACHE STATS
+# --------------------------------------------------
+@router.get("/cache/stats", dependencies=[Depends(get_current_admin)])
+async def project_cache_stats():
+    """Hit/miss counters for the in-process project cache."""
+    return {**project_cache.stats(), "loads_in_flight": _loads.in_flight}
 
 
 # --------------------------------------------------
 # GET SINGLE PROJECT
 # --------------------------------------------------
 @router.get("/{project_id}", response_model=ProjectResponse)
-def get_single_project(
+async def get_single_project(
+    request: Request,
     project_id: int,
-    db: Session = Depends(get_db),
 ):
-    """Fetches a detailed project view by ID."""
-    project = get_project(db, project_id)
+    """Fetches a detailed project view by ID (supports conditional GET)."""
+    key = ("project", project_id)
+    version = project_cache.project_version(project_id)
+    modified_at = project_cache.project_modified_at(project_id)
+    cached = project_cache.get(key, version)
 
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Project with ID {project_id} not found",
-        )
+    async def load() -> dict:
+        async with AsyncSessionLocal() as db:
+            project = await aget_project(db, project_id)
+
+            if not project:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Project with ID {project_id} not found",
+                )
+
+            body = ProjectResponse.model_validate(project).model_dump_json().encode()
+        entry = _cache_entry(body, modified_at)
+        project_cache.set(key, version, entry)
+        return entry
+
+    if cached is None:
+        cached, _ = await _loads.do((key, version), load)
 
-    return project
+    return _json_response(request, cached)
 
 
 # --------------------------------------------------
@@ -88,16 +386,16 @@ def get_single_project(
     response_model=ProjectResponse,
     dependencies=[Depends(get_current_admin)],
 )
-def edit_project(
+async def edit_project(
     project_id: int,
     project: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Updates an existing project.
     Allows for the new 'deep' fields (architecture, learnings, etc.)
     """
-    updated_project = update_project(
+    updated_project = await aupdate_project(
         db=db,
         project_id=project_id,
         project_update=project,
@@ -119,12 +417,12 @@ def edit_project(
     status_code=status.HTTP_200_OK,
     dependencies=[Depends(get_current_admin)],
 )
-def remove_project(
+async def remove_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Permanently deletes a project from Neon."""
-    success = delete_project(db=db, project_id=project_id)
+    success = await adelete_project(db=db, project_id=project_id)
 
     if not success:
         raise HTTPException(
@@ -0,0 +1,24 @@
+import argparse
+import os
+
+from services.context_artifact import ARTIFACT_NAME, build_artifact
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+
+
+if __name__ == "__main__":
+    # Run as `python app/build_context.py` from backend/ (the Dockerfile does
+    # this at build time). Needs no environment variables or database.
+    parser = argparse.ArgumentParser(
+        description="Pre-extract the chatbot resume/summary text"
+    )
+    parser.add_argument("--resume", default=os.path.join(RESOURCES_DIR, "resume.pdf"))
+    parser.add_argument("--summary", default=os.path.join(RESOURCES_DIR, "summary.txt"))
+    parser.add_argument("--out", default=os.path.join(RESOURCES_DIR, ARTIFACT_NAME))
+    args = parser.parse_args()
+
+    data = build_artifact(args.resume, args.summary, args.out)
+    print(
+        f"✅ Context artifact written to {args.out} "
+        f"({len(data['resume'])} resume chars, {len(data['summary'])} summary chars)."
+    )
@@ -0,0 +1,238 @@
+"""
+Response compression middleware (brotli / gzip)
+
+Starlette's GZipMiddleware has no brotli and no content-type allowlist, so
+this is a small pure-ASGI replacement. Streaming bodies (NDJSON export) are
+compressed chunk by chunk and flushed so they stay incremental; anything
+outside the allowlist passes through. text/event-stream (chat) is always
+left alone, even if added to the allowlist: a proxy or client that buffers
+compressed data would hold back tokens.
+"""
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "application/javascript",
+)
+
+# Never compressed, whatever the allowlist says
+NEVER_COMPRESS = frozenset({"text/event-stream"})
+
+
+def negotiate_encoding(accept_encoding: str, preferred: Iterable[str]) -> Optional[str]:
+    """First of `preferred` the client accepts (q > 0), or None"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding] = q
+    for coding in preferred:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class _StreamCompressor:
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        if coding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._br is not None:
+            return self._br.finish()
+        return self._gz.flush()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = DEFAULT_CONTENT_TYPES,
+        encodings: Iterable[str] = ("br", "gzip"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_size: int = 256,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = frozenset(content_types) - NEVER_COMPRESS
+        self.encodings = tuple(e for e in encodings if e in ("br", "gzip"))
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        # Bodies with an ETag are identical on every send (e.g. the project
+        # cache's entries), so their compressed form is worth keeping
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        # What was done to the 200 for each recent ETag ("encoded" or
+        # "vary"), so a 304 for it can repeat the same validators
+        self._variants: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        coding = negotiate_encoding(accept, self.encodings)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(self, coding, send).send)
+
+    def compress(self, coding: str, body: bytes, etag: Optional[str]) -> bytes:
+        key = (etag, coding) if etag else None
+        if key is not None:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    return cached
+
+        if coding == "br":
+            data = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            data = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+        if key is not None and self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = data
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return data
+
+    def remember_variant(self, etag: Optional[str], variant: str):
+        if not etag:
+            return
+        with self._lock:
+            self._variants[etag] = variant
+            self._variants.move_to_end(etag)
+            while len(self._variants) > max(self.cache_size, 1) * 16:
+                self._variants.popitem(last=False)
+
+    def variant_of(self, etag: Optional[str]) -> Optional[str]:
+        if not etag:
+            return None
+        with self._lock:
+            return self._variants.get(etag)
+
+    def eligible(self, headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in self.content_types
+
+
+class _Responder:
+    """Holds back http.response.start until the first body chunk is seen"""
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send):
+        self.mw = middleware
+        self.coding = coding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._stream: Optional[_StreamCompressor] = None
+        self._passthrough = False
+
+    def _prepare_headers(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.coding
+        self._mark_variant(headers)
+
+    @staticmethod
+    def _mark_variant(headers: MutableHeaders):
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # Compressed bytes differ from the identity representation
+            headers["ETag"] = "W/" + etag
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._start is not None:
+            start, self._start = self._start, None
+            headers = MutableHeaders(raw=start["headers"])
+            status = start["status"]
+            etag = headers.get("etag")
+            if status == 304:
+                # Repeat what the 200 for this ETag got, so caches update the
+                # right entry; if that 200 wasn't seen, leave the validators
+                variant = self.mw.variant_of(etag)
+                if variant == "encoded":
+                    self._mark_variant(headers)
+                elif variant == "vary":
+                    headers.add_vary_header("Accept-Encoding")
+                self._passthrough = True
+            elif not self.mw.eligible(headers) or status == 204:
+                self._passthrough = True
+            elif not more_body and len(body) < self.mw.minimum_size:
+                headers.add_vary_header("Accept-Encoding")
+                self.mw.remember_variant(etag, "vary")
+                self._passthrough = True
+
+            if self._passthrough:
+                await self._send(start)
+                await self._send(message)
+                return
+
+            self.mw.remember_variant(etag, "encoded")
+            if not more_body:
+                body = self.mw.compress(self.coding, body, etag)
+                self._prepare_headers(headers)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            self._prepare_headers(headers)
+            if "content-length" in headers:
+                del headers["content-length"]
+            self._stream = _StreamCompressor(
+                self.coding, self.mw.gzip_level, self.mw.brotli_quality
+            )
+            await self._send(start)
+
+        assert self._stream is not None
+        data = self._stream.chunk(body) if body else b""
+        if not more_body:
+            data += self._stream.finish()
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
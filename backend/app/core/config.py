@@ -1,4 +1,6 @@
 import os
+import tempfile
+from typing import List
 
 from dotenv import load_dotenv
 
@@ -21,6 +23,15 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _csv_env(name: str, default: str) -> List[str]:
+    raw = os.getenv(name, default)
+    return [item.strip().lower() for item in raw.split(",") if item.strip()]
+
+
+def _bool_env(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
 # --- Required Config ---
 ADMIN_USERNAME: str = _require_env("ADMIN_USERNAME")
 ADMIN_PASSWORD_HASH: str = _require_env("ADMIN_PASSWORD_HASH")
@@ -32,19 +43,155 @@ GEMINI_API_KEY: str = _require_env("GEMINI_API_KEY")
 PUSHOVER_USER: str = _require_env("PUSHOVER_USER")
 PUSHOVER_TOKEN: str = _require_env("PUSHOVER_TOKEN")
 
+# --- Upstream endpoints (overridable for local fakes / benchmarks) ---
+GEMINI_BASE_URL: str = os.getenv(
+    "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/"
+)
+PUSHOVER_API_URL: str = os.getenv(
+    "PUSHOVER_API_URL", "https://api.pushover.net/1/messages.json"
+)
+
+# --- LLM provider (api/routes/chatbot.py builds the router from these) ---
+# "gemini" (any OpenAI-compatible endpoint at GEMINI_BASE_URL) or "local",
+# a deterministic offline provider for tests and benchmarks
+LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini").strip().lower()
+LLM_MODEL: str = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+# Used when the primary keeps failing or its circuit is open; "" disables
+LLM_FALLBACK_MODEL: str = os.getenv("LLM_FALLBACK_MODEL", "gemini-2.5-flash-lite")
+# Optional comma-separated keys, used round-robin to spread quota
+GEMINI_API_KEYS: List[str] = [
+    key.strip()
+    for key in os.getenv("GEMINI_API_KEYS", GEMINI_API_KEY).split(",")
+    if key.strip()
+]
+LLM_REQUEST_TIMEOUT_SECONDS: float = float(
+    os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "30")
+)
+LLM_CONNECT_TIMEOUT_SECONDS: float = float(
+    os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5")
+)
+LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+# Retries per model on transient errors (timeouts, 429, 5xx) before falling back
+LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS: float = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+LLM_RETRY_BACKOFF_MAX_SECONDS: float = float(
+    os.getenv("LLM_RETRY_BACKOFF_MAX_SECONDS", "4")
+)
+# Consecutive failures that open a model's circuit; 0 disables the breaker
+LLM_BREAKER_FAILURES: int = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# --- Startup ---
+# create_all, FTS index and tag backfill in the lifespan. Off by default so a
+# cold start never waits on DDL; docker-compose opts in for the local
+# database, deployments apply the schema with `python app/startup.py`
+DB_INIT_ON_STARTUP: bool = _bool_env("DB_INIT_ON_STARTUP", "false")
+# Banner with sanitized config values, printed at import
+CONFIG_DEBUG: bool = _bool_env("CONFIG_DEBUG", "false")
+
 # --- Default Settings ---
 ALGORITHM: str = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+# --- Login (bcrypt runs on its own small pool; attempts are throttled first) ---
+AUTH_HASH_WORKERS: int = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+# Checks queued or running beyond this are rejected with 503
+AUTH_HASH_MAX_PENDING: int = int(os.getenv("AUTH_HASH_MAX_PENDING", "8"))
+# Token buckets per client IP and per username; a rate of 0 disables one
+LOGIN_IP_RATE_PER_MINUTE: float = float(os.getenv("LOGIN_IP_RATE_PER_MINUTE", "10"))
+LOGIN_IP_BURST: int = int(os.getenv("LOGIN_IP_BURST", "5"))
+LOGIN_USER_RATE_PER_MINUTE: float = float(os.getenv("LOGIN_USER_RATE_PER_MINUTE", "5"))
+LOGIN_USER_BURST: int = int(os.getenv("LOGIN_USER_BURST", "5"))
+# Proxies in front of the app that append to X-Forwarded-For (Cloud Run's
+# front end is one). Per-IP limits use the address the outermost trusted
+# proxy saw; 0 uses the TCP peer and ignores the header
+TRUSTED_PROXY_HOPS: int = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+# --- Projects ---
+PROJECT_CACHE_MAX_ENTRIES: int = int(os.getenv("PROJECT_CACHE_MAX_ENTRIES", "512"))
+PROJECT_CACHE_TTL_SECONDS: int = int(os.getenv("PROJECT_CACHE_TTL_SECONDS", "300"))
+# Rows per bulk INSERT/upsert statement during NDJSON import / export page size
+PROJECT_IMPORT_CHUNK_SIZE: int = int(os.getenv("PROJECT_IMPORT_CHUNK_SIZE", "500"))
+PROJECT_BATCH_MAX_ITEMS: int = int(os.getenv("PROJECT_BATCH_MAX_ITEMS", "1000"))
+
+# --- Static catalog snapshot (empty SNAPSHOT_DIR disables rebuilds on write) ---
+SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "")
+SNAPSHOT_KEEP_VERSIONS: int = int(os.getenv("SNAPSHOT_KEEP_VERSIONS", "3"))
+SNAPSHOT_DEBOUNCE_SECONDS: float = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "2"))
+
+# --- Responses (compression middleware in main.py) ---
+COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Preference order; drop "br" or set "" to disable compression
+COMPRESSION_ENCODINGS: List[str] = _csv_env("COMPRESSION_ENCODINGS", "br,gzip")
+COMPRESSION_CONTENT_TYPES: List[str] = _csv_env(
+    "COMPRESSION_CONTENT_TYPES",
+    "application/json,application/x-ndjson,text/plain,text/html,text/css,"
+    "application/javascript",
+)
+COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# --- Metrics (/metrics answers 404 unless a token is set) ---
+METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+# --- Chatbot ---
+# Pre-extracted resume/summary (build_context.py); default resources/context.json
+CHAT_CONTEXT_ARTIFACT: str = os.getenv("CHAT_CONTEXT_ARTIFACT", "")
+# How often a chat turn may stat the resume/summary for edits (0 = every turn)
+CHAT_CONTEXT_CHECK_SECONDS: float = float(os.getenv("CHAT_CONTEXT_CHECK_SECONDS", "5"))
+RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "4"))
+CHAT_CACHE_MAX_ENTRIES: int = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "256"))
+CHAT_CACHE_TTL_SECONDS: int = int(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600"))
+CHAT_CACHE_MAX_HISTORY: int = int(os.getenv("CHAT_CACHE_MAX_HISTORY", "2"))
+CHAT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+CHAT_HISTORY_SUMMARY_TOKENS: int = int(os.getenv("CHAT_HISTORY_SUMMARY_TOKENS", "300"))
+# Tool loop bounds: per-tool timeout, tool rounds per turn, whole-turn deadline
+CHAT_TOOL_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_TOOL_TIMEOUT_SECONDS", "5"))
+CHAT_MAX_TOOL_ROUNDS: int = int(os.getenv("CHAT_MAX_TOOL_ROUNDS", "3"))
+CHAT_TURN_DEADLINE_SECONDS: float = float(os.getenv("CHAT_TURN_DEADLINE_SECONDS", "60"))
+
+# --- Chat sessions (server-side history; "sqlite" shares it across workers) ---
+CHAT_SESSION_BACKEND: str = os.getenv("CHAT_SESSION_BACKEND", "memory").lower()
+CHAT_SESSION_SQLITE_PATH: str = os.getenv(
+    "CHAT_SESSION_SQLITE_PATH",
+    os.path.join(tempfile.gettempdir(), "chat_sessions.sqlite3"),
+)
+CHAT_SESSION_TTL_SECONDS: int = int(os.getenv("CHAT_SESSION_TTL_SECONDS", "1800"))
+CHAT_SESSION_MAX_SESSIONS: int = int(os.getenv("CHAT_SESSION_MAX_SESSIONS", "10000"))
+# Messages kept per session; older ones are dropped
+CHAT_SESSION_MAX_MESSAGES: int = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "40"))
+
+# --- Chatbot admission (checked before any LLM or Pushover call) ---
+# Token buckets per client IP; a rate of 0 disables one
+CHAT_IP_RATE_PER_MINUTE: float = float(os.getenv("CHAT_IP_RATE_PER_MINUTE", "20"))
+CHAT_IP_BURST: int = int(os.getenv("CHAT_IP_BURST", "10"))
+CONTACT_IP_RATE_PER_MINUTE: float = float(os.getenv("CONTACT_IP_RATE_PER_MINUTE", "3"))
+CONTACT_IP_BURST: int = int(os.getenv("CONTACT_IP_BURST", "3"))
+# Chat turns in flight per process; beyond that up to CHAT_MAX_QUEUE wait,
+# and the rest get 429 with Retry-After. 0 disables the cap.
+CHAT_MAX_CONCURRENT: int = int(os.getenv("CHAT_MAX_CONCURRENT", "8"))
+CHAT_MAX_QUEUE: int = int(os.getenv("CHAT_MAX_QUEUE", "16"))
+CHAT_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", "10"))
+
+# --- Notifications (Pushover dispatcher) ---
+NOTIFY_BATCH_WINDOW_SECONDS: float = float(
+    os.getenv("NOTIFY_BATCH_WINDOW_SECONDS", "2")
+)
+NOTIFY_MAX_RETRIES: int = int(os.getenv("NOTIFY_MAX_RETRIES", "3"))
+NOTIFY_SPILL_PATH: str = os.getenv(
+    "NOTIFY_SPILL_PATH", os.path.join(tempfile.gettempdir(), "pushover_spill.ndjson")
+)
+
 # --- DEBUG INFO ---
-print("=" * 60)
-print("CONFIG DEBUG INFO (SANITIZED):")
-print(f"Username: {ADMIN_USERNAME}")
-print(
-    f"Database Host: {DATABASE_URL.split('@')[-1].split('/')[0]}"
-)  # Only shows the host
-print(f"Hash starts with: {ADMIN_PASSWORD_HASH[:10]}")
-print(
-    f"Is valid hash format: {ADMIN_PASSWORD_HASH.startswith(('$2a$', '$2b$', '$2y$'))}"
-)
-print("=" * 60)
+if CONFIG_DEBUG:
+    print("=" * 60)
+    print("CONFIG DEBUG INFO (SANITIZED):")
+    print(f"Username: {ADMIN_USERNAME}")
+    print(
+        f"Database Host: {DATABASE_URL.split('@')[-1].split('/')[0]}"
+    )  # Only shows the host
+    print(f"Hash starts with: {ADMIN_PASSWORD_HASH[:10]}")
+    print(
+        f"Is valid hash format: {ADMIN_PASSWORD_HASH.startswith(('$2a$', '$2b$', '$2y$'))}"
+    )
+    print("=" * 60)
@@ -0,0 +1,243 @@
+"""
+Metrics
+Minimal Prometheus-format counters/histograms with per-thread shards
+
+Hot paths never take a lock: every thread increments its own dict of
+values (the event loop thread, or a threadpool worker for sync code), and
+the /metrics scrape sums the shards. A lock is only taken the first time
+a thread touches a metric.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+
+
+class _Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = _Registry()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _ShardedMetric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict] = []
+        self._shards_lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _shard(self) -> Dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict = {}
+            with self._shards_lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def _items(self):
+        for shard in list(self._shards):
+            yield from list(shard.items())
+
+
+class Counter(_ShardedMetric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for labels, value in self._items():
+            totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def expose(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}"
+            for labels, v in sorted(self.values().items())
+        ]
+
+
+class Histogram(_ShardedMetric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = HTTP_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()):
+        shard = self._shard()
+        slots = shard.get(labels)
+        if slots is None:
+            # one count per bucket, one for +Inf, then the running sum
+            slots = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def expose(self) -> List[str]:
+        merged: Dict[Labels, List[float]] = {}
+        for labels, slots in self._items():
+            total = merged.setdefault(labels, [0] * len(slots))
+            for i, v in enumerate(list(slots)):
+                total[i] += v
+
+        lines = []
+        for labels, slots in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), slots[:-1]):
+                cumulative += count
+                le = _format_labels(
+                    self.labelnames + ("le",), labels + (_format_value(float(bound)),)
+                )
+                lines.append(f"{self.name}_bucket{le} {int(cumulative)}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(slots[-1])}")
+            lines.append(f"{self.name}_count{label_str} {int(cumulative)}")
+        return lines
+
+
+class Gauge:
+    """Sampled at scrape time from a callback returning [(labels, value), ...]"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+        REGISTRY.register(self)
+
+    def expose(self) -> List[str]:
+        try:
+            samples = list(self._collect())
+        except Exception as e:
+            print(f"Metrics gauge {self.name} error: {e}")
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}"
+            for labels, v in samples
+        ]
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# --------------------------------------------------
+# HTTP
+# --------------------------------------------------
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last body chunk sent.",
+    ("method", "route"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Records per-route count and latency. Routes are labelled by their path
+    template (/projects/{project_id}), never the raw path, to bound label
+    cardinality. Streaming responses are timed until their last chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = ["500"]
+        recorded = [False]
+
+        def record():
+            if recorded[0]:
+                return
+            recorded[0] = True
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc((method, path, status[0]))
+            HTTP_LATENCY.observe(time.perf_counter() - start, (method, path))
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
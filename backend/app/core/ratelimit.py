@@ -0,0 +1,163 @@
+"""
+Rate limiting
+Token buckets keyed by client (IP, username, ...) and a concurrency cap
+with a bounded wait queue, held in process memory
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Hashable, Optional
+
+from core.config import TRUSTED_PROXY_HOPS
+from fastapi import Request
+
+
+class TokenBucketLimiter:
+    """
+    One bucket per key: `burst` tokens, refilled at `rate` per second.
+    Buckets are kept in LRU order and capped at `max_keys`, so a flood of
+    distinct keys costs bounded memory (an evicted key simply starts full).
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: Hashable, cost: float = 1.0) -> float:
+        """
+        Spend `cost` tokens from `key`'s bucket. Returns 0 if allowed,
+        otherwise the seconds until enough tokens will be available.
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self, key: Hashable):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class Overloaded(Exception):
+    """Rejected by a ConcurrencyLimiter; retry after `retry_after` seconds"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Overloaded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` holders at a time; up to `max_queue` more wait in FIFO
+    order for at most `queue_timeout` seconds. Anything beyond that is
+    rejected at once with Overloaded. The suggested retry delay is the
+    queue length times an average hold time, spread over the slots.
+    Admission and release are O(1). Meant for a single event loop (one
+    uvicorn worker); a `limit` of 0 or less disables it.
+    """
+
+    def __init__(self, limit: int, max_queue: int = 0, queue_timeout: float = 10.0):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._avg_hold = 1.0
+
+    def retry_after(self) -> float:
+        return max(1.0, self._avg_hold * (self.queued + 1) / max(self.limit, 1))
+
+    async def acquire(self):
+        if self.limit <= 0:
+            return
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            # A slot handed over just as the caller gave up goes to the next one
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise Overloaded(self.retry_after()) from None
+            raise
+        finally:
+            self.queued -= 1
+
+    def release(self, held: Optional[float] = None):
+        if self.limit <= 0:
+            return
+        if held is not None:
+            self._avg_hold += (held - self._avg_hold) * 0.2
+        # The slot passes straight to the next live waiter; cancelled or
+        # timed-out waiters are skipped here rather than removed from the middle
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+
+def client_ip(
+    request: Request, trusted_hops: int = TRUSTED_PROXY_HOPS
+) -> Optional[str]:
+    """
+    Address to key per-IP limits on. Each of the `trusted_hops` proxies
+    appends the address it received from to X-Forwarded-For, so the entry
+    that many places from the end is the one a client cannot forge; entries
+    further left are whatever the client sent.
+    """
+    peer = request.client.host if request.client else None
+    if trusted_hops <= 0:
+        return peer
+    forwarded = ",".join(request.headers.getlist("x-forwarded-for"))
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    if not hops:
+        return peer
+    return hops[-min(trusted_hops, len(hops))]
@@ -0,0 +1,20 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    App-wide default response class: orjson instead of json.dumps.
+
+    By the time render() runs FastAPI has already validated the return
+    value against the response_model and run jsonable_encoder over it, so
+    this only replaces the final encoding step. Hot routes that return a
+    model skip all of that by returning a Response with pre-serialized
+    bytes (model_dump_json / TypeAdapter.dump_json) instead, as the project
+    cache, tags, chat and login routes do.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -1,4 +1,10 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
 import bcrypt
+from core.config import AUTH_HASH_MAX_PENDING, AUTH_HASH_WORKERS
 
 
 def hash_password(password: str) -> str:
@@ -22,3 +28,80 @@ def verify_password(plain: str, hashed: str) -> bool:
     except Exception as e:
         print(f"Auth Error: {e}")
         return False
+
+
+@lru_cache(maxsize=4)
+def _dummy_hash(rounds: int) -> bytes:
+    return bcrypt.hashpw(b"dummy-password", bcrypt.gensalt(rounds=rounds))
+
+
+def _hash_rounds(hashed: str) -> int:
+    try:
+        return min(max(int(hashed.split("$")[2]), 4), 31)
+    except (IndexError, ValueError):
+        return 12
+
+
+def verify_dummy(plain: str, like_hash: str) -> bool:
+    """
+    Spend the same bcrypt work as checking against `like_hash`, then return
+    False. Used for unknown usernames so response time doesn't reveal them.
+    """
+    bcrypt.checkpw(plain.encode(), _dummy_hash(_hash_rounds(like_hash)))
+    return False
+
+
+# --------------------------------------------------
+# ASYNC (dedicated bcrypt pool)
+# --------------------------------------------------
+class PasswordCheckBusy(Exception):
+    """Too many bcrypt checks already queued; the caller should back off"""
+
+
+# Kept apart from the default threadpool so login bursts can't take the
+# slots sync routes and DB calls run on
+_hash_executor: Optional[ThreadPoolExecutor] = None
+# Only touched on the event loop thread
+_pending = 0
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=AUTH_HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+
+async def _run_hash_check(fn, *args) -> bool:
+    global _pending
+    if _pending >= AUTH_HASH_MAX_PENDING:
+        raise PasswordCheckBusy()
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def averify_password(plain: str, hashed: str) -> bool:
+    return await _run_hash_check(verify_password, plain, hashed)
+
+
+async def averify_dummy(plain: str, like_hash: str) -> bool:
+    return await _run_hash_check(verify_dummy, plain, like_hash)
+
+
+async def awarm_dummy_hash(like_hash: str):
+    """Build the dummy hash at startup so the first unknown user isn't slower"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_executor(), _dummy_hash, _hash_rounds(like_hash))
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
@@ -0,0 +1,55 @@
+"""
+Single-flight
+Concurrent identical async calls share one execution and its result
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from core.metrics import Counter
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Calls per group by role: leader ran the work, shared joined one in flight.",
+    ("group", "role"),
+)
+
+
+class SingleFlight:
+    """
+    At most one execution per key at a time. The work runs in its own task,
+    so a caller that goes away (client disconnect) does not cancel it for
+    the others, and every caller gets the same result or the same
+    exception. The key is dropped as soon as the work finishes: only calls
+    that overlap are merged, caching stays the caller's job. Keys must
+    include everything the result depends on, such as a cache version.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """(result, shared): shared is True if another caller's run was joined"""
+        loop = asyncio.get_running_loop()
+        task = self._flights.get(key)
+        shared = task is not None and task.get_loop() is loop
+        if not shared:
+            task = loop.create_task(fn())  # type: ignore[arg-type]
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        SINGLEFLIGHT_CALLS.inc((self.group, "shared" if shared else "leader"))
+        return await asyncio.shield(task), shared  # type: ignore[arg-type]
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Mark the error as retrieved even if every caller has gone away
+        if not task.cancelled():
+            task.exception()
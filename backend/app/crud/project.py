@@ -1,14 +1,99 @@
+import base64
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from crud.search import (
+    adrop_search_rows,
+    aindex_search_row,
+    aindex_search_rows,
+    drop_search_row,
+    index_search_row,
+)
+from crud.tag import (
+    aclear_projects_tags,
+    aset_project_tags,
+    aset_projects_tags,
+    clear_project_tags,
+    set_project_tags,
+    tagged_project_ids,
+)
 from models.project import Project
-from schemas.project import ProjectCreate, ProjectUpdate
+from schemas.project import (
+    ProjectBatchUpdate,
+    ProjectCreate,
+    ProjectImport,
+    ProjectUpdate,
+)
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+# Columns needed by the list page (schemas.project.ProjectSummary)
+SUMMARY_COLUMNS = (
+    Project.id,
+    Project.title,
+    Project.short_description,
+    Project.tech_stack,
+    Project.github_url,
+    Project.live_url,
+    Project.created_at,
+)
+
+# Columns an import line or a PATCH may set
+WRITABLE_COLUMNS = tuple(ProjectUpdate.model_fields)
+
+_PG_RESET_ID_SEQUENCE = (
+    "SELECT setval(pg_get_serial_sequence('projects', 'id'), "
+    "coalesce((SELECT max(id) FROM projects), 0) + 1, false)"
+)
+
+# Called as listener(action, project_id, project) after every committed write.
+# action is "create", "update" or "delete"; project is None for deletes.
+ProjectWriteListener = Callable[[str, int, Optional[Project]], None]
+_write_listeners: List[ProjectWriteListener] = []
+
+
+def add_write_listener(listener: ProjectWriteListener):
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def remove_write_listener(listener: ProjectWriteListener):
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+
+def _notify_write(action: str, project_id: int, project: Optional[Project] = None):
+    for listener in list(_write_listeners):
+        try:
+            listener(action, project_id, project)
+        except Exception as e:
+            print(f"Project write listener error: {e}")
+
 
 def create_project(db: Session, project: ProjectCreate):
     db_project = Project(**project.model_dump())
 
     db.add(db_project)
+    db.flush()
+    index_search_row(db, db_project)
+    set_project_tags(db, db_project)
     db.commit()
     db.refresh(db_project)
+    _notify_write("create", db_project.id, db_project)
 
     return db_project
 
@@ -17,6 +102,73 @@ def get_projects(db: Session):
     return db.query(Project).all()
 
 
+def encode_cursor(created_at: datetime, project_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{project_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError on a malformed cursor"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, project_id = base64.urlsafe_b64decode(padded).decode().split("|")
+    return datetime.fromisoformat(created_at), int(project_id)
+
+
+def _summary_statement(
+    limit: int,
+    cursor: Optional[str],
+    tags: Optional[List[str]] = None,
+    match: str = "all",
+):
+    """
+    SELECT for one page of summary rows, newest first, keyset-paginated on
+    (created_at, id). Fetches limit + 1 rows to detect a next page.
+    `tags` filters by normalized tech-stack tag (match="all" AND, "any" OR).
+    """
+    stmt = select(*SUMMARY_COLUMNS)
+    if tags:
+        stmt = stmt.where(Project.id.in_(tagged_project_ids(tags, match)))
+    if cursor:
+        created_at, project_id = decode_cursor(cursor)
+        # Compare against the stored value of the cursor row so the database's
+        # own timestamp representation is used; fall back to the encoded
+        # value if that row has since been deleted.
+        boundary = func.coalesce(
+            select(Project.created_at)
+            .where(Project.id == project_id)
+            .scalar_subquery(),
+            created_at,
+        )
+        stmt = stmt.where(
+            or_(
+                Project.created_at < boundary,
+                and_(Project.created_at == boundary, Project.id < project_id),
+            )
+        )
+
+    return stmt.order_by(Project.created_at.desc(), Project.id.desc()).limit(limit + 1)
+
+
+def _summary_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def get_project_summaries(
+    db: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    match: str = "all",
+) -> Tuple[list, Optional[str]]:
+    """Returns (rows, next_cursor); next_cursor is None on the last page."""
+    rows = db.execute(_summary_statement(limit, cursor, tags, match)).all()
+    return _summary_page(list(rows), limit)
+
+
 def get_project(db: Session, project_id: int):
     return db.get(Project, project_id)
 
@@ -33,8 +185,12 @@ def update_project(db: Session, project_id: int, project_update: ProjectUpdate):
     for key, value in update_data.items():
         setattr(db_project, key, value)
 
+    index_search_row(db, db_project)
+    if "tech_stack" in update_data:
+        set_project_tags(db, db_project)
     db.commit()
     db.refresh(db_project)
+    _notify_write("update", db_project.id, db_project)
 
     return db_project
 
@@ -46,7 +202,297 @@ def delete_project(db: Session, project_id: int):
     if not db_project:
         return False
 
+    drop_search_row(db, project_id)
+    clear_project_tags(db, project_id)
     db.delete(db_project)
     db.commit()
+    _notify_write("delete", project_id)
 
     return True
+
+
+# --------------------------------------------------
+# ASYNC VARIANTS (used by the API routes)
+# --------------------------------------------------
+async def acreate_project(db: AsyncSession, project: ProjectCreate):
+    db_project = Project(**project.model_dump())
+
+    db.add(db_project)
+    await db.flush()
+    await aindex_search_row(db, db_project)
+    await aset_project_tags(db, db_project)
+    await db.commit()
+    await db.refresh(db_project)
+    _notify_write("create", db_project.id, db_project)
+
+    return db_project
+
+
+async def aget_projects(db: AsyncSession):
+    result = await db.execute(select(Project))
+    return result.scalars().all()
+
+
+async def aget_project_summaries(
+    db: AsyncSession,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    match: str = "all",
+) -> Tuple[list, Optional[str]]:
+    result = await db.execute(_summary_statement(limit, cursor, tags, match))
+    return _summary_page(list(result.all()), limit)
+
+
+async def aget_project(db: AsyncSession, project_id: int):
+    return await db.get(Project, project_id)
+
+
+async def aget_last_modified(db: AsyncSession) -> Optional[datetime]:
+    """Newest row timestamp; the schema has no updated_at, so created_at"""
+    return await db.scalar(select(func.max(Project.created_at)))
+
+
+async def _aupdate_returning(db: AsyncSession, project_id: int, changes: dict):
+    """UPDATE ... RETURNING: one round trip instead of SELECT + UPDATE + refresh"""
+    if not changes:
+        return await db.get(Project, project_id)
+    stmt = (
+        update(Project)
+        .where(Project.id == project_id)
+        .values(**changes)
+        .returning(Project)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def aupdate_project(
+    db: AsyncSession, project_id: int, project_update: ProjectUpdate
+):
+    update_data = project_update.model_dump(exclude_unset=True)
+    db_project = await _aupdate_returning(db, project_id, update_data)
+
+    if not db_project:
+        return None
+
+    await aindex_search_row(db, db_project)
+    if "tech_stack" in update_data:
+        await aset_project_tags(db, db_project)
+    await db.commit()
+    _notify_write("update", db_project.id, db_project)
+
+    return db_project
+
+
+async def adelete_project(db: AsyncSession, project_id: int):
+    deleted, _ = await adelete_projects(db, [project_id])
+    return bool(deleted)
+
+
+# --------------------------------------------------
+# BULK (admin import/export and batch endpoints)
+# --------------------------------------------------
+def _dialect_insert(db: AsyncSession):
+    """INSERT with ON CONFLICT; db/session only builds Postgres and SQLite engines"""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert(Project)
+    return sqlite_insert(Project)
+
+
+async def _aupdate_many_returning(
+    db: AsyncSession, rows: List[dict]
+) -> Dict[int, Project]:
+    """
+    UPDATE ... RETURNING for many rows; each dict is {"id": ..., column: value}.
+    Rows are grouped by the columns they set and each group is one statement
+    that sets every column from a CASE on id, so a batch costs one round trip
+    per distinct field set. Returns the rows that exist, keyed by id.
+    """
+    groups: Dict[Tuple[str, ...], Dict[int, dict]] = {}
+    for row in rows:
+        changes = {k: v for k, v in row.items() if k != "id"}
+        groups.setdefault(tuple(sorted(changes)), {})[row["id"]] = changes
+
+    found: Dict[int, Project] = {}
+    for fields, by_id in groups.items():
+        if fields:
+            values = {
+                field: case(
+                    {
+                        project_id: literal(
+                            changes[field], getattr(Project, field).type
+                        )
+                        for project_id, changes in by_id.items()
+                    },
+                    value=Project.id,
+                )
+                for field in fields
+            }
+            stmt = (
+                update(Project)
+                .where(Project.id.in_(by_id))
+                .values(values)
+                .returning(Project)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            stmt = select(Project).where(Project.id.in_(by_id))
+        stmt = stmt.execution_options(populate_existing=True)
+        for project in (await db.execute(stmt)).scalars():
+            found[project.id] = project
+    return found
+
+
+async def aiter_projects(
+    db: AsyncSession, chunk_size: int = 500
+) -> AsyncIterator[List[Project]]:
+    """Every project in id order, one keyset page of full rows at a time"""
+    last_id = 0
+    while True:
+        stmt = (
+            select(Project)
+            .where(Project.id > last_id)
+            .order_by(Project.id)
+            .limit(chunk_size)
+        )
+        page = list((await db.execute(stmt)).scalars())
+        if not page:
+            return
+        yield page
+        last_id = page[-1].id
+        db.expunge_all()
+
+
+async def _aimport_chunk(db: AsyncSession, records: List[ProjectImport]):
+    """Bulk INSERT new rows and upsert rows with an id, each with RETURNING"""
+    new_rows, keyed_rows = [], []
+    for record in records:
+        row = record.model_dump(exclude={"id", "created_at"})
+        if record.created_at is not None:
+            row["created_at"] = record.created_at
+        if record.id is None:
+            new_rows.append(row)
+        else:
+            keyed_rows.append({"id": record.id, **row})
+
+    written: List[Tuple[str, Project]] = []
+    if new_rows:
+        result = await db.scalars(
+            insert(Project).returning(Project, sort_by_parameter_order=True),
+            new_rows,
+        )
+        written.extend(("create", p) for p in result)
+    if keyed_rows:
+        stmt = _dialect_insert(db)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Project.id],
+            set_={c: stmt.excluded[c] for c in WRITABLE_COLUMNS},
+        )
+        result = await db.scalars(
+            stmt.returning(Project),
+            keyed_rows,
+            execution_options={"populate_existing": True},
+        )
+        written.extend(("update", p) for p in result)
+
+    projects = [p for _, p in written]
+    await aindex_search_rows(db, projects)
+    await aset_projects_tags(db, projects)
+    return written, bool(keyed_rows)
+
+
+async def aimport_projects(
+    db: AsyncSession,
+    records: AsyncIterator[ProjectImport],
+    chunk_size: int = 500,
+) -> Tuple[int, int]:
+    """
+    Insert/upsert a stream of records in chunks inside ONE transaction:
+    either the whole import lands or none of it does.
+    Returns (rows written, chunks executed).
+    """
+    written: List[Tuple[str, Project]] = []
+    chunks = 0
+    explicit_ids = False
+    batch: List[ProjectImport] = []
+
+    async def flush():
+        nonlocal chunks, explicit_ids
+        rows, keyed = await _aimport_chunk(db, batch)
+        written.extend(rows)
+        explicit_ids = explicit_ids or keyed
+        chunks += 1
+        batch.clear()
+
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= chunk_size:
+            await flush()
+    if batch:
+        await flush()
+
+    if explicit_ids and db.get_bind().dialect.name == "postgresql":
+        # Explicit ids don't advance the serial; keep the next create from colliding
+        await db.execute(text(_PG_RESET_ID_SEQUENCE))
+    await db.commit()
+
+    for action, project in written:
+        _notify_write(action, project.id, project)
+    return len(written), chunks
+
+
+async def aupdate_projects(
+    db: AsyncSession, updates: List[ProjectBatchUpdate]
+) -> Tuple[List[Project], List[int]]:
+    """
+    Batch PATCH in one transaction; returns (updated rows, missing ids).
+    Items that change the same fields share one UPDATE ... RETURNING.
+    """
+    rows = [
+        {"id": item.id, **item.model_dump(exclude_unset=True, exclude={"id"})}
+        for item in updates
+    ]
+    projects = await _aupdate_many_returning(db, rows)
+    missing = [row["id"] for row in rows if row["id"] not in projects]
+    updated = [
+        projects[i] for i in dict.fromkeys(row["id"] for row in rows) if i in projects
+    ]
+    retagged_ids = {row["id"] for row in rows if "tech_stack" in row}
+    retagged = [p for p in updated if p.id in retagged_ids]
+
+    await aindex_search_rows(db, updated)
+    if retagged:
+        await aset_projects_tags(db, retagged)
+    await db.commit()
+
+    for db_project in updated:
+        _notify_write("update", db_project.id, db_project)
+    return updated, missing
+
+
+async def adelete_projects(
+    db: AsyncSession, project_ids: List[int]
+) -> Tuple[List[int], List[int]]:
+    """DELETE ... RETURNING id in one transaction; returns (deleted, missing)"""
+    project_ids = list(dict.fromkeys(project_ids))
+    if not project_ids:
+        return [], []
+
+    await adrop_search_rows(db, project_ids)
+    await aclear_projects_tags(db, project_ids)
+    result = await db.execute(
+        delete(Project)
+        .where(Project.id.in_(project_ids))
+        .returning(Project.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = set(result.scalars())
+    await db.commit()
+
+    for project_id in deleted:
+        _notify_write("delete", project_id)
+    return (
+        [i for i in project_ids if i in deleted],
+        [i for i in project_ids if i not in deleted],
+    )
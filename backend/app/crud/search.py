@@ -0,0 +1,202 @@
+"""
+Full-text search over projects.
+
+Postgres: a generated, weighted tsvector column with a GIN index, so the
+database maintains it on every INSERT/UPDATE by itself.
+SQLite: an FTS5 table keyed by project id, kept in step by the write
+functions in crud/project.py inside the same transaction.
+"""
+
+import re
+from typing import List, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Long-text columns folded into the lowest-weight part of the index
+BODY_COLUMNS = (
+    "problem_statement",
+    "why_built",
+    "architecture",
+    "implementation_details",
+    "challenges",
+    "learnings",
+    "future_improvements",
+)
+
+_SNIPPET_COLUMNS = ("short_description",) + BODY_COLUMNS
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _concat_sql(columns) -> str:
+    return " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+
+
+# create_all never adds an index to an existing table; this backs the
+# keyset pagination on projects created before the index was declared
+_KEYSET_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_projects_created_at_id ON projects (created_at, id)"
+)
+
+_PG_DDL = [
+    f"""
+    ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, {_concat_sql(("short_description", "tech_stack"))}), 'B') ||
+        setweight(to_tsvector('english'::regconfig, {_concat_sql(BODY_COLUMNS)}), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_projects_search_vector "
+    "ON projects USING GIN (search_vector)",
+]
+
+_PG_SEARCH = f"""
+    SELECT id, title, short_description, tech_stack, created_at, rank,
+           ts_headline('english', {_concat_sql(_SNIPPET_COLUMNS)}, query,
+                       'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8'
+           ) AS snippet
+    FROM (
+        SELECT p.*, q.query, ts_rank_cd(p.search_vector, q.query) AS rank
+        FROM projects p, websearch_to_tsquery('english', :q) AS q(query)
+        WHERE p.search_vector @@ q.query
+        ORDER BY rank DESC, p.id DESC
+        LIMIT :limit
+    ) AS hits
+    ORDER BY rank DESC, id DESC
+"""
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+    "title, short_description, tech_stack, body, tokenize='porter unicode61')"
+]
+
+_SQLITE_SEARCH = """
+    SELECT p.id, p.title, p.short_description, p.tech_stack, p.created_at,
+           -bm25(projects_fts, 10.0, 4.0, 4.0, 1.0) AS rank,
+           snippet(projects_fts, -1, '<mark>', '</mark>', '…', 16) AS snippet
+    FROM projects_fts
+    JOIN projects p ON p.id = projects_fts.rowid
+    WHERE projects_fts MATCH :q
+    ORDER BY rank DESC, p.id DESC
+    LIMIT :limit
+"""
+
+_SQLITE_UPSERT = [
+    "DELETE FROM projects_fts WHERE rowid = :id",
+    "INSERT INTO projects_fts (rowid, title, short_description, tech_stack, body) "
+    "VALUES (:id, :title, :short_description, :tech_stack, :body)",
+]
+
+_SQLITE_REBUILD = [
+    "DELETE FROM projects_fts",
+    "INSERT INTO projects_fts (rowid, title, short_description, tech_stack, body) "
+    "SELECT id, title, short_description, tech_stack, "
+    f"trim({_concat_sql(BODY_COLUMNS)}) FROM projects",
+]
+
+
+def _dialect(db) -> str:
+    return db.get_bind().dialect.name
+
+
+# --------------------------------------------------
+# SCHEMA
+# --------------------------------------------------
+def ensure_search_index(conn: Connection):
+    """
+    Idempotent: add the keyset index, the search column/index (Postgres) or
+    the FTS5 table (SQLite), backfilling FTS5 if it is out of step with
+    `projects`. Run after create_all, e.g. via
+    `await conn.run_sync(ensure_search_index)`.
+    """
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        conn.execute(text(_KEYSET_INDEX_DDL))
+    if dialect == "postgresql":
+        for ddl in _PG_DDL:
+            conn.execute(text(ddl))
+    elif dialect == "sqlite":
+        for ddl in _SQLITE_DDL:
+            conn.execute(text(ddl))
+        indexed = conn.execute(text("SELECT count(*) FROM projects_fts")).scalar()
+        total = conn.execute(text("SELECT count(*) FROM projects")).scalar()
+        if indexed != total:
+            for stmt in _SQLITE_REBUILD:
+                conn.execute(text(stmt))
+
+
+# --------------------------------------------------
+# WRITE HOOKS (SQLite FTS5 only; Postgres maintains itself)
+# --------------------------------------------------
+def _fts_params(project) -> dict:
+    return {
+        "id": project.id,
+        "title": project.title or "",
+        "short_description": project.short_description or "",
+        "tech_stack": project.tech_stack or "",
+        "body": " ".join(filter(None, (getattr(project, c) for c in BODY_COLUMNS))),
+    }
+
+
+def index_search_rows(db: Session, projects: Sequence):
+    if _dialect(db) == "sqlite" and projects:
+        params = [_fts_params(p) for p in projects]
+        for stmt in _SQLITE_UPSERT:
+            db.execute(text(stmt), params)
+
+
+def drop_search_rows(db: Session, project_ids: Sequence[int]):
+    if _dialect(db) == "sqlite" and project_ids:
+        db.execute(text(_SQLITE_UPSERT[0]), [{"id": i} for i in project_ids])
+
+
+async def aindex_search_rows(db: AsyncSession, projects: Sequence):
+    if _dialect(db) == "sqlite" and projects:
+        params = [_fts_params(p) for p in projects]
+        for stmt in _SQLITE_UPSERT:
+            await db.execute(text(stmt), params)
+
+
+async def adrop_search_rows(db: AsyncSession, project_ids: Sequence[int]):
+    if _dialect(db) == "sqlite" and project_ids:
+        await db.execute(text(_SQLITE_UPSERT[0]), [{"id": i} for i in project_ids])
+
+
+def index_search_row(db: Session, project):
+    index_search_rows(db, [project])
+
+
+def drop_search_row(db: Session, project_id: int):
+    drop_search_rows(db, [project_id])
+
+
+async def aindex_search_row(db: AsyncSession, project):
+    await aindex_search_rows(db, [project])
+
+
+async def adrop_search_row(db: AsyncSession, project_id: int):
+    await adrop_search_rows(db, [project_id])
+
+
+# --------------------------------------------------
+# QUERY
+# --------------------------------------------------
+def _fts5_query(q: str) -> str:
+    """Quote every word so user input can't inject FTS5 operators (AND semantics)"""
+    return " ".join(f'"{word}"' for word in _WORD_RE.findall(q))
+
+
+async def asearch_projects(db: AsyncSession, q: str, limit: int = 20) -> List:
+    """Ranked matches with a highlighted snippet (<mark>…</mark>)"""
+    # db/session only builds Postgres and SQLite engines
+    if _dialect(db) == "postgresql":
+        result = await db.execute(text(_PG_SEARCH), {"q": q, "limit": limit})
+    else:
+        match = _fts5_query(q)
+        if not match:
+            return []
+        result = await db.execute(text(_SQLITE_SEARCH), {"q": match, "limit": limit})
+    return list(result.all())
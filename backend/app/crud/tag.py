@@ -0,0 +1,177 @@
+"""
+Tech-stack tags: normalized Tag rows linked to projects via project_tags.
+
+Project.tech_stack (a comma-separated string) stays the source of truth
+for display; the crud write functions re-derive a project's tags from it.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from models.project import Project
+from models.tag import Tag, project_tags
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_tag(raw: str) -> str:
+    return _SPACE_RE.sub(" ", raw.strip()).lower()
+
+
+def parse_tech_stack(tech_stack: Optional[str]) -> Dict[str, str]:
+    """'Python, FastAPI ,python' -> {'python': 'Python', 'fastapi': 'FastAPI'}"""
+    tags: Dict[str, str] = {}
+    for part in (tech_stack or "").split(","):
+        label = _SPACE_RE.sub(" ", part.strip())
+        name = normalize_tag(label)
+        if name and len(name) <= 100 and name not in tags:
+            tags[name] = label
+    return tags
+
+
+# --------------------------------------------------
+# QUERY HELPERS
+# --------------------------------------------------
+def tagged_project_ids(names: Sequence[str], match: str = "all"):
+    """
+    Subquery of project ids carrying the given tags. match="any" is OR;
+    match="all" is AND (every tag present).
+    """
+    names = sorted({normalize_tag(n) for n in names if n.strip()})
+    stmt = (
+        select(project_tags.c.project_id)
+        .join(Tag, Tag.id == project_tags.c.tag_id)
+        .where(Tag.name.in_(names))
+    )
+    if match == "all":
+        stmt = stmt.group_by(project_tags.c.project_id).having(
+            func.count(func.distinct(project_tags.c.tag_id)) == len(names)
+        )
+    return stmt
+
+
+def _tag_counts_statement():
+    count = func.count(project_tags.c.project_id).label("count")
+    return (
+        select(Tag.name, Tag.label, count)
+        .join(project_tags, project_tags.c.tag_id == Tag.id)
+        .group_by(Tag.id, Tag.name, Tag.label)
+        .order_by(count.desc(), Tag.name)
+    )
+
+
+def get_tag_counts(db: Session) -> List:
+    """Every tag in use with its project count, in one aggregate query"""
+    return list(db.execute(_tag_counts_statement()).all())
+
+
+async def aget_tag_counts(db: AsyncSession) -> List:
+    result = await db.execute(_tag_counts_statement())
+    return list(result.all())
+
+
+# --------------------------------------------------
+# WRITES (called from crud/project.py before commit)
+# --------------------------------------------------
+def _plan(projects: Sequence[Project]):
+    """Per-project tags, plus the union of all names: name -> first label seen"""
+    per_project = {p.id: parse_tech_stack(p.tech_stack) for p in projects}
+    labels: Dict[str, str] = {}
+    for tags in per_project.values():
+        for name, label in tags.items():
+            labels.setdefault(name, label)
+    return per_project, labels
+
+
+def _link_rows(per_project: Dict[int, Dict[str, str]], ids: Dict[str, int]):
+    return [
+        {"project_id": project_id, "tag_id": ids[name]}
+        for project_id, tags in per_project.items()
+        for name in tags
+    ]
+
+
+def _missing_tag_rows(labels: Dict[str, str], existing: Dict[str, int]) -> List[dict]:
+    return [
+        {"name": name, "label": label}
+        for name, label in labels.items()
+        if name not in existing
+    ]
+
+
+def set_projects_tags(db: Session, projects: Sequence[Project]):
+    """Re-derive tags for many projects with a fixed number of statements"""
+    per_project, labels = _plan(projects)
+    clear_projects_tags(db, list(per_project))
+    if not labels:
+        return
+
+    lookup = select(Tag.name, Tag.id).where(Tag.name.in_(labels))
+    existing = dict(db.execute(lookup).all())
+    missing = _missing_tag_rows(labels, existing)
+    if missing:
+        db.execute(insert(Tag), missing)
+        existing = dict(db.execute(lookup).all())
+
+    db.execute(insert(project_tags), _link_rows(per_project, existing))
+
+
+async def aset_projects_tags(db: AsyncSession, projects: Sequence[Project]):
+    per_project, labels = _plan(projects)
+    await aclear_projects_tags(db, list(per_project))
+    if not labels:
+        return
+
+    lookup = select(Tag.name, Tag.id).where(Tag.name.in_(labels))
+    existing = dict((await db.execute(lookup)).all())
+    missing = _missing_tag_rows(labels, existing)
+    if missing:
+        await db.execute(insert(Tag), missing)
+        existing = dict((await db.execute(lookup)).all())
+
+    await db.execute(insert(project_tags), _link_rows(per_project, existing))
+
+
+def set_project_tags(db: Session, project: Project):
+    set_projects_tags(db, [project])
+
+
+async def aset_project_tags(db: AsyncSession, project: Project):
+    await aset_projects_tags(db, [project])
+
+
+def clear_projects_tags(db: Session, project_ids: Sequence[int]):
+    db.execute(delete(project_tags).where(project_tags.c.project_id.in_(project_ids)))
+
+
+async def aclear_projects_tags(db: AsyncSession, project_ids: Sequence[int]):
+    await db.execute(
+        delete(project_tags).where(project_tags.c.project_id.in_(project_ids))
+    )
+
+
+def clear_project_tags(db: Session, project_id: int):
+    clear_projects_tags(db, [project_id])
+
+
+async def aclear_project_tags(db: AsyncSession, project_id: int):
+    await aclear_projects_tags(db, [project_id])
+
+
+def tags_need_backfill(db: Session) -> bool:
+    """True when projects exist but no project has any tag links yet"""
+    has_links = db.execute(select(project_tags.c.project_id).limit(1)).first()
+    if has_links is not None:
+        return False
+    return db.execute(select(Project.id).limit(1)).first() is not None
+
+
+def backfill_tags(db: Session) -> int:
+    """Derive tags for every project from its tech_stack. Returns rows processed."""
+    projects = db.execute(select(Project)).scalars().all()
+    set_projects_tags(db, projects)
+    db.commit()
+    return len(projects)
@@ -1,8 +1,14 @@
 import os
+import ssl
+import time
 
+from core.metrics import Gauge, Histogram
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 load_dotenv()
 
@@ -11,10 +17,54 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set in environment variables")
 
+# --------------------------------------------------
+# POOL METRICS
+# --------------------------------------------------
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection (includes connecting).",
+    ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+class _TimedCheckout:
+    """Pool mixin: time _do_get, which blocks while the pool is exhausted"""
+
+    engine_label = ""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start, (self.engine_label,))
+
+
+class _SyncPool(_TimedCheckout, QueuePool):
+    engine_label = "sync"
+
+
+class _AsyncPool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def _pool_args(url, pool_class) -> dict:
+    """Timed queue pool for server databases and SQLite files, else the default"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {"poolclass": pool_class}
+
+
+# --------------------------------------------------
+# SYNC ENGINE (startup.py / sync_db.py scripts)
+# --------------------------------------------------
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
+    **_pool_args(DATABASE_URL, _SyncPool),
 )
 
 SessionLocal = sessionmaker(
@@ -22,3 +72,88 @@ SessionLocal = sessionmaker(
     autoflush=False,
     bind=engine,
 )
+
+
+# --------------------------------------------------
+# ASYNC ENGINE (API routes)
+# --------------------------------------------------
+def _verified_ssl_context(sslmode: str, rootcert: str | None) -> ssl.SSLContext:
+    """
+    libpq's verify-ca / verify-full: check the server certificate against
+    sslrootcert (or the system store), and the hostname only for verify-full.
+    """
+    context = ssl.create_default_context(cafile=rootcert or None)
+    context.check_hostname = sslmode == "verify-full"
+    return context
+
+
+def _async_url(url: str):
+    """
+    Map a sync DATABASE_URL onto its async driver: asyncpg for Postgres,
+    aiosqlite for SQLite. libpq-only query options (sslmode, sslrootcert,
+    channel_binding) are translated into asyncpg connect args.
+    """
+    parsed = make_url(url)
+    connect_args: dict = {}
+
+    if parsed.get_backend_name() == "postgresql":
+        query = dict(parsed.query)
+        sslmode = query.pop("sslmode", None)
+        rootcert = query.pop("sslrootcert", None)
+        query.pop("channel_binding", None)
+        if sslmode in ("verify-ca", "verify-full"):
+            connect_args["ssl"] = _verified_ssl_context(sslmode, rootcert)
+        elif sslmode and sslmode != "disable":
+            connect_args["ssl"] = "require"
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+
+    return parsed, connect_args
+
+
+_async_database_url, _async_connect_args = _async_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    _async_database_url,
+    connect_args=_async_connect_args,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    **_pool_args(_async_database_url, _AsyncPool),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def _pool_samples(attr: str):
+    for label, pool in (
+        ("sync", engine.pool),
+        ("async", async_engine.sync_engine.pool),
+    ):
+        method = getattr(pool, attr, None)
+        if method is not None:
+            yield (label,), method()
+
+
+Gauge(
+    "db_pool_size",
+    "Configured pool size.",
+    ("engine",),
+    lambda: _pool_samples("size"),
+)
+Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out (in use).",
+    ("engine",),
+    lambda: _pool_samples("checkedout"),
+)
+Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative while the pool is filling).",
+    ("engine",),
+    lambda: _pool_samples("overflow"),
+)
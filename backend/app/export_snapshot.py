@@ -0,0 +1,29 @@
+import argparse
+import asyncio
+
+from core.config import SNAPSHOT_DIR, SNAPSHOT_KEEP_VERSIONS
+from db.session import async_engine
+from services.snapshot import abuild_snapshot
+
+
+async def export_snapshot(out_dir: str, keep: int):
+    try:
+        return await abuild_snapshot(out_dir, keep=keep)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    # Run as `python app/export_snapshot.py --out ./snapshot` from backend/,
+    # then sync the directory to the bucket/CDN origin.
+    parser = argparse.ArgumentParser(description="Render the catalog to static files")
+    parser.add_argument("--out", default=SNAPSHOT_DIR or "snapshot")
+    parser.add_argument("--keep", type=int, default=SNAPSHOT_KEEP_VERSIONS)
+    args = parser.parse_args()
+
+    print(f"Rendering catalog snapshot to {args.out}...")
+    manifest, changed = asyncio.run(export_snapshot(args.out, args.keep))
+    state = "written" if changed else "unchanged"
+    print(
+        f"✅ Snapshot {manifest['version']} {state} ({manifest['projects']} projects)."
+    )
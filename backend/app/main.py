@@ -1,29 +1,117 @@
+import hmac
 from contextlib import asynccontextmanager
 
 from api.routes.auth import router as auth_router
+from api.routes.chatbot import create_chat_sessions, create_chatbot_service
 from api.routes.chatbot import router as chatbot_router
 from api.routes.projects import router as project_router
-from db.base import Base
-from db.session import engine
-from fastapi import FastAPI
+from core.compression import CompressionMiddleware
+from core.config import (
+    ADMIN_PASSWORD_HASH,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CONTENT_TYPES,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    DB_INIT_ON_STARTUP,
+    METRICS_TOKEN,
+    NOTIFY_BATCH_WINDOW_SECONDS,
+    NOTIFY_MAX_RETRIES,
+    NOTIFY_SPILL_PATH,
+    PUSHOVER_API_URL,
+    PUSHOVER_TOKEN,
+    PUSHOVER_USER,
+    SNAPSHOT_DEBOUNCE_SECONDS,
+    SNAPSHOT_DIR,
+    SNAPSHOT_KEEP_VERSIONS,
+)
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.metrics import MetricsMiddleware, render_metrics
+from core.responses import FastJSONResponse
+from core.security import awarm_dummy_hash, shutdown_hash_executor
+from crud.project import (
+    add_write_listener,
+    aget_last_modified,
+    aget_projects,
+    remove_write_listener,
+)
+from db.session import AsyncSessionLocal, async_engine
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from services.notifications import NotificationDispatcher
+from services.project_cache import project_cache
+from services.snapshot import SnapshotScheduler
+from startup import init_db
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Opt-in (DB_INIT_ON_STARTUP=true, as in docker-compose): a cold start
+    # should not wait on DDL round trips to the remote database
+    if DB_INIT_ON_STARTUP:
+        try:
+            init_db()
+            print("=" * 60)
+            print("DB initialized")
+            print("=" * 60)
+        except Exception as e:
+            print("=" * 60)
+            print("DB error:", e)
+            print("=" * 60)
+
+    await awarm_dummy_hash(ADMIN_PASSWORD_HASH)
+
+    # Pushover sends happen on a background worker; handlers only enqueue
+    app.state.notifier = NotificationDispatcher(
+        pushover_user=PUSHOVER_USER,
+        pushover_token=PUSHOVER_TOKEN,
+        pushover_url=PUSHOVER_API_URL,
+        batch_window=NOTIFY_BATCH_WINDOW_SECONDS,
+        max_retries=NOTIFY_MAX_RETRIES,
+        spill_path=NOTIFY_SPILL_PATH,
+    )
+    await app.state.notifier.start()
+
+    # One chatbot per process: the OpenAI client and parsed resume are reused
+    app.state.chatbot = create_chatbot_service(notifier=app.state.notifier)
+    try:
+        async with AsyncSessionLocal() as db:
+            app.state.chatbot.index_projects(await aget_projects(db))
+    except Exception as e:
+        print("Project indexing error:", e)
     try:
-        Base.metadata.create_all(bind=engine)
-        print("=" * 60)
-        print("DB initialized")
-        print("=" * 60)
+        async with AsyncSessionLocal() as db:
+            project_cache.seed_modified_at(await aget_last_modified(db))
     except Exception as e:
-        print("=" * 60)
-        print("DB error:", e)
-        print("=" * 60)
+        print("Project cache seeding error:", e)
+    add_write_listener(app.state.chatbot.on_project_write)
+    app.state.chat_sessions = create_chat_sessions()
+    add_write_listener(project_cache.on_project_write)
+
+    # Static catalog for the CDN: rebuilt (debounced) after every admin write
+    app.state.snapshots = None
+    if SNAPSHOT_DIR:
+        app.state.snapshots = SnapshotScheduler(
+            SNAPSHOT_DIR,
+            keep=SNAPSHOT_KEEP_VERSIONS,
+            debounce=SNAPSHOT_DEBOUNCE_SECONDS,
+        )
+        app.state.snapshots.start()
+        add_write_listener(app.state.snapshots.on_project_write)
     yield
+    if app.state.snapshots is not None:
+        remove_write_listener(app.state.snapshots.on_project_write)
+        await app.state.snapshots.stop()
+    remove_write_listener(project_cache.on_project_write)
+    remove_write_listener(app.state.chatbot.on_project_write)
+    await app.state.chat_sessions.aclose()
+    await app.state.chatbot.aclose()
+    await app.state.notifier.stop()
+    shutdown_hash_executor()
+    await async_engine.dispose()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,7 +119,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    content_types=COMPRESSION_CONTENT_TYPES,
+    encodings=COMPRESSION_ENCODINGS,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
 )
+# Outermost, so latency includes compression
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/test-pushover")
@@ -68,3 +167,15 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus text format; disabled unless METRICS_TOKEN is set"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,23 @@
+from crud.search import ensure_search_index
+from crud.tag import backfill_tags
+from db.base import Base
+from db.session import SessionLocal, engine
+
+
+def migrate_tags():
+    """Create the tags tables (if missing) and derive tags from tech_stack"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+    db = SessionLocal()
+    try:
+        return backfill_tags(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # Run as `python app/migrate_tags.py` from backend/ (or inside the container)
+    print("Backfilling project tags...")
+    count = migrate_tags()
+    print(f"✅ Tagged {count} projects.")
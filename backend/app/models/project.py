@@ -1,10 +1,12 @@
 from db.base import Base
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
 from sqlalchemy.sql import func
 
 
 class Project(Base):
     __tablename__ = "projects"
+    # Keyset pagination walks (created_at, id) newest first
+    __table_args__ = (Index("ix_projects_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
@@ -0,0 +1,31 @@
+from db.base import Base
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table
+
+# Many-to-many link between projects and normalized tech-stack tags
+project_tags = Table(
+    "project_tags",
+    Base.metadata,
+    Column(
+        "project_id",
+        Integer,
+        ForeignKey("projects.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "tag_id",
+        Integer,
+        ForeignKey("tags.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    # The PK covers project -> tags; this covers tag -> projects
+    Index("ix_project_tags_tag_id_project_id", "tag_id", "project_id"),
+)
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Normalized form used for lookups ("next.js"), label as first written ("Next.js")
+    name = Column(String(100), nullable=False, unique=True, index=True)
+    label = Column(String(100), nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -33,6 +33,67 @@ class ProjectUpdate(BaseModel):
     live_url: Optional[str] = None
 
 
+class ProjectImport(ProjectUpdate):
+    """
+    One NDJSON import line: a full record, as produced by the export.
+    Lines with an id upsert that row; lines without one are inserted.
+    """
+
+    id: Optional[int] = None
+    title: str
+    short_description: str
+    created_at: Optional[datetime] = None
+
+
+class ProjectBatchUpdate(ProjectUpdate):
+    """One entry of a batch PATCH: the id plus the fields to change"""
+
+    id: int
+
+
+class ProjectBatchDelete(BaseModel):
+    ids: List[int]
+
+
+class ProjectSummary(BaseModel):
+    """List-page projection: no long-text columns"""
+
+    id: int
+    title: str
+    short_description: str
+    tech_stack: Optional[str] = None
+    github_url: Optional[str] = None
+    live_url: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectSearchResult(BaseModel):
+    """Full-text hit: summary fields plus relevance and a <mark>-highlighted snippet"""
+
+    id: int
+    title: str
+    short_description: str
+    tech_stack: Optional[str] = None
+    created_at: datetime
+    rank: float
+    snippet: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TagCount(BaseModel):
+    name: str
+    label: str
+    count: int
+
+    class Config:
+        from_attributes = True
+
+
 class ProjectResponse(ProjectBase):
     id: int
     created_at: datetime
@@ -48,3 +109,18 @@ class ProjectResponse(ProjectBase):
 
     class Config:
         from_attributes = True
+
+
+class ProjectImportResult(BaseModel):
+    imported: int
+    chunks: int
+
+
+class ProjectBatchUpdateResult(BaseModel):
+    updated: List[ProjectResponse]
+    missing: List[int]
+
+
+class ProjectBatchDeleteResult(BaseModel):
+    deleted: List[int]
+    missing: List[int]
@@ -1,19 +1,28 @@
+import hmac
 from datetime import datetime, timedelta, timezone
 
 from core.config import ALGORITHM, SECRET_KEY
-from core.security import verify_password
+from core.security import averify_dummy, averify_password, verify_dummy, verify_password
 from jose import jwt
 
 
-def authenticate(username, password, admin_user, admin_hash):
-    if username != admin_user:
-        return False
+def _is_admin(username: str, admin_user: str) -> bool:
+    return hmac.compare_digest(username.encode(), admin_user.encode())
+
 
-    print(f"DEBUG: Hash starts with: {admin_hash[:20] if admin_hash else 'None'}...")
-    print(f"DEBUG: Hash length: {len(admin_hash) if admin_hash else 0}")
+def authenticate(username, password, admin_user, admin_hash):
+    if not _is_admin(username, admin_user):
+        return verify_dummy(password, admin_hash)
     return verify_password(password, admin_hash)
 
 
+async def aauthenticate(username, password, admin_user, admin_hash) -> bool:
+    """Async twin of authenticate(); bcrypt runs on the dedicated hash pool"""
+    if not _is_admin(username, admin_user):
+        return await averify_dummy(password, admin_hash)
+    return await averify_password(password, admin_hash)
+
+
 def create_token(data: dict, expires: int):
     to_encode = data.copy()
 
@@ -0,0 +1,219 @@
+"""
+Chat Sessions
+Server-side conversation history, so clients send only the new message
+
+Two interchangeable stores with the same async interface:
+- MemorySessionStore: per-process, bounded TTL + LRU (the default)
+- SqliteSessionStore: one local SQLite file shared by all workers on a host
+"""
+
+import asyncio
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+Messages = List[Dict[str, str]]
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(18)
+
+
+def _trim(messages: Messages, max_messages: int) -> Messages:
+    # Older turns are dropped; HistoryCompactor summarises what is kept
+    return messages[-max_messages:] if max_messages > 0 else messages
+
+
+class MemorySessionStore:
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 1800,
+        max_messages: int = 40,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self._sessions: "OrderedDict[str, Tuple[float, Messages]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    async def aload(self, session_id: str) -> Optional[Messages]:
+        """Stored messages (sliding expiry), or None if unknown/expired"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            expires_at, messages = entry
+            if expires_at < time.monotonic():
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (time.monotonic() + self.ttl_seconds, messages)
+            self._sessions.move_to_end(session_id)
+            return list(messages)
+
+    async def aappend(self, session_id: str, messages: Messages):
+        """Add messages to a session, creating it if needed"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            stored = entry[1] if entry is not None else []
+            stored = _trim(stored + list(messages), self.max_messages)
+            self._sessions[session_id] = (time.monotonic() + self.ttl_seconds, stored)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    async def adelete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "evictions": self.evictions}
+
+    async def astats(self) -> Dict[str, float]:
+        return self.stats()
+
+
+class SqliteSessionStore:
+    """
+    Same bounds as MemorySessionStore, kept in a WAL-mode SQLite file so
+    every uvicorn worker on the host sees the same sessions. Calls run in a
+    worker thread; expired and least-recently-used rows are pruned every
+    `prune_every` writes rather than on each one.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 1800,
+        max_messages: int = 40,
+        prune_every: int = 100,
+    ):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_sessions ("
+                "id TEXT PRIMARY KEY, expires_at REAL NOT NULL, messages TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_chat_sessions_expires_at "
+                "ON chat_sessions (expires_at)"
+            )
+
+    # Wall-clock time: expiry must agree across processes
+    def _load(self, session_id: str) -> Optional[Messages]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT expires_at, messages FROM chat_sessions WHERE id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] < now:
+                self._conn.execute(
+                    "DELETE FROM chat_sessions WHERE id = ?", (session_id,)
+                )
+                return None
+            self._conn.execute(
+                "UPDATE chat_sessions SET expires_at = ? WHERE id = ?",
+                (now + self.ttl_seconds, session_id),
+            )
+            return json.loads(row[1])
+
+    def _append(self, session_id: str, messages: Messages):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT messages FROM chat_sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            stored = json.loads(row[0]) if row else []
+            stored = _trim(stored + list(messages), self.max_messages)
+            self._conn.execute(
+                "INSERT INTO chat_sessions (id, expires_at, messages) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "expires_at = excluded.expires_at, messages = excluded.messages",
+                (session_id, now + self.ttl_seconds, json.dumps(stored)),
+            )
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                self._prune(now)
+
+    def _prune(self, now: float):
+        self._conn.execute("DELETE FROM chat_sessions WHERE expires_at < ?", (now,))
+        # Expiry is refreshed on every access, so the oldest expiry is the LRU
+        self._conn.execute(
+            "DELETE FROM chat_sessions WHERE id IN ("
+            "SELECT id FROM chat_sessions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        )
+
+    def _delete(self, session_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM chat_sessions WHERE id = ?", (session_id,)
+            )
+            return cursor.rowcount > 0
+
+    async def aload(self, session_id: str) -> Optional[Messages]:
+        return await asyncio.to_thread(self._load, session_id)
+
+    async def aappend(self, session_id: str, messages: Messages):
+        await asyncio.to_thread(self._append, session_id, messages)
+
+    async def adelete(self, session_id: str) -> bool:
+        return await asyncio.to_thread(self._delete, session_id)
+
+    async def aclose(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM chat_sessions"
+            ).fetchone()
+        return {"sessions": count}
+
+    async def astats(self) -> Dict[str, float]:
+        return await asyncio.to_thread(self.stats)
+
+
+def create_session_store(
+    backend: str,
+    sqlite_path: str = "",
+    max_sessions: int = 10000,
+    ttl_seconds: float = 1800,
+    max_messages: int = 40,
+):
+    if backend == "sqlite":
+        return SqliteSessionStore(
+            sqlite_path,
+            max_sessions=max_sessions,
+            ttl_seconds=ttl_seconds,
+            max_messages=max_messages,
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown chat session backend: {backend}")
+    return MemorySessionStore(
+        max_sessions=max_sessions, ttl_seconds=ttl_seconds, max_messages=max_messages
+    )
@@ -3,63 +3,278 @@ AI Chatbot Service
 Handles chatbot functionality with tool calling for portfolio assistant
 """
 
-import json
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, NamedTuple, Optional
 
-import requests
-from openai import OpenAI
-from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
-from pypdf import PdfReader
+from core.metrics import LLM_BUCKETS, Counter, Histogram
+from core.singleflight import SingleFlight
+from services.context_artifact import (
+    ARTIFACT_NAME,
+    extract_resume_text,
+    load_artifact,
+    source_digest,
+)
+from services.history import HistoryCompactor, summary_message
+from services.llm import (
+    DeadlineExceeded,
+    LLMRouter,
+    LLMUnavailable,
+    create_llm_router,
+    time_left,
+)
+from services.notifications import PUSHOVER_URL, NotificationDispatcher
+from services.response_cache import ResponseCache, make_cache_key
+from services.retrieval import RetrievalIndex, build_query, format_chunks
+from services.tools import Tool, ToolRegistry
+
+# openai (and pypdf, requests) take ~0.6s to import; they load on first use
+# so a cold start can serve /health and /projects before any chat arrives
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+GEMINI_MODEL = "gemini-2.5-flash"
+
+LLM_REQUESTS = Counter(
+    "chatbot_llm_requests_total",
+    "Upstream chat completion calls by outcome (ok, error, cancelled).",
+    ("model", "mode", "outcome"),
+)
+LLM_LATENCY = Histogram(
+    "chatbot_llm_latency_seconds",
+    "Upstream completion latency; streams are timed until the last chunk.",
+    ("model", "mode"),
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "chatbot_llm_tokens_total",
+    "Token usage reported by the upstream response.usage.",
+    ("model", "type"),
+)
+CHAT_TURNS = Counter(
+    "chatbot_chats_total",
+    "Turns by outcome (answered, cached, coalesced, timeout, unavailable, error).",
+    ("mode", "outcome"),
+)
+CHAT_ROUND_TRIPS = Histogram(
+    "chatbot_round_trips",
+    "Upstream completion calls needed per chat turn.",
+    ("mode",),
+    buckets=(1, 2, 3, 4, 6, 8),
+)
+
+TIMEOUT_REPLY = "Sorry, that took longer than expected. Could you try asking again?"
+UNAVAILABLE_REPLY = (
+    "Sorry, I can't reach my language model right now. Please try again shortly."
+)
+
+
+class ChatAnswer(NamedTuple):
+    """A turn's reply and the model that produced it (cached as a pair)"""
+
+    text: str
+    model: str
+
+
+class ChatTurnFailed(Exception):
+    """A turn that produced no answer; `reply` is the message to show instead"""
+
+    def __init__(self, reply: str, outcome: str):
+        super().__init__(reply)
+        self.reply = reply
+        self.outcome = outcome
 
 
 class ChatbotService:
     def __init__(
-        self, gemini_api_key: str, pushover_user: str = "", pushover_token: str = ""
+        self,
+        gemini_api_key: str,
+        pushover_user: str = "",
+        pushover_token: str = "",
+        notifier: Optional[NotificationDispatcher] = None,
+        retrieval_top_k: int = 4,
+        response_cache: Optional[ResponseCache] = None,
+        cache_max_history: int = 2,
+        history_compactor: Optional[HistoryCompactor] = None,
+        base_url: str = GEMINI_BASE_URL,
+        pushover_url: str = PUSHOVER_URL,
+        context_artifact: str = "",
+        context_check_interval: float = 5.0,
+        tool_timeout: float = 5.0,
+        max_tool_rounds: int = 3,
+        turn_deadline: float = 60.0,
+        llm: Optional[LLMRouter] = None,
     ):
         """Initialize chatbot service with OpenAI-compatible Gemini API"""
-        self.client = OpenAI(
-            api_key=gemini_api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-        )
-        self.model_name = (
-            "gemini-2.5-flash"  # Fixed: was "gemini-2.5-flash" which doesn't exist
+        # Retries, fallback model and key rotation live in the router; the
+        # default is a single Gemini model with the router's default policy
+        self.llm = llm or create_llm_router(
+            "gemini", [gemini_api_key], base_url, GEMINI_MODEL
         )
         self.pushover_user = pushover_user
         self.pushover_token = pushover_token
-        self.pushover_url = "https://api.pushover.net/1/messages.json"
+        self.pushover_url = pushover_url
+        # When set, notifications are queued for the background worker instead
+        self.notifier = notifier
 
         # Professional Identity
         self.name = "Sohail Shaik"
         self.title = "Data Platform Engineer"
         self.company = "Tata Consultancy Services"
 
-        # Load portfolio context and tools
+        # Portfolio context is parsed once and cached; see refresh_context()
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        resume_path = os.path.join(base_dir, "resources", "resume.pdf")
-        summary_path = os.path.join(base_dir, "resources", "summary.txt")
-        summary = ""
+        self.resume_path = os.path.join(base_dir, "resources", "resume.pdf")
+        self.summary_path = os.path.join(base_dir, "resources", "summary.txt")
+        # Pre-extracted text from build_context.py; used when its digest matches
+        self.artifact_path = context_artifact or os.path.join(
+            base_dir, "resources", ARTIFACT_NAME
+        )
+        self._context_lock = threading.Lock()
+        self._context_mtimes: Optional[tuple] = None
+        self._context_digest: Optional[str] = None
+        # Turns stat the source files at most once per interval
+        self.context_check_interval = context_check_interval
+        self._next_context_check = 0.0
+        # Only the chunks relevant to each question go into the prompt
+        self.index = RetrievalIndex()
+        self.retrieval_top_k = retrieval_top_k
+        # Repeat questions with the same context are answered from here
+        self.response_cache = response_cache
+        self.cache_max_history = cache_max_history
+        # Identical history-free questions asked at the same time share a turn
+        self.turns = SingleFlight("chat")
+        # Long conversations are folded into a summary to stay within budget
+        self.history_compactor = history_compactor or HistoryCompactor()
+        self.refresh_context(force=True)
+
+        # A turn gets max_tool_rounds tool rounds, then must answer in text;
+        # turn_deadline bounds the whole turn (0 disables it)
+        self.max_tool_rounds = max_tool_rounds
+        self.turn_deadline = turn_deadline
+        self.tool_registry = self._build_tool_registry(tool_timeout)
+        # tools list needs to be cast for the OpenAI SDK type checker
+        self.tools: List["ChatCompletionToolParam"] = self.tool_registry.schemas()  # type: ignore
+
+    @property
+    def model_name(self) -> str:
+        """Primary model; the metrics label each call with the model that answered"""
+        return self.llm.model
+
+    @property
+    def prompt_version(self) -> str:
+        """Resource content hash plus retrieval index version; changes on any edit"""
+        return f"{(self._context_digest or '')[:12]}.{self.index.version}"
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_bytes(path: str) -> bytes:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return b""
+
+    def _context_check_due(self) -> bool:
+        """True at most once per context_check_interval seconds"""
+        now = time.monotonic()
+        if now < self._next_context_check:
+            return False
+        self._next_context_check = now + self.context_check_interval
+        return True
+
+    def refresh_context(self, force: bool = False) -> bool:
+        """
+        Re-index the resume and summary if either changed on disk.
+        A changed mtime triggers a content hash; the PDF is only re-parsed
+        when that hash differs. Returns True if the index was rebuilt.
+        Unforced calls look at the files at most once per
+        context_check_interval seconds.
+        """
+        if not force and not self._context_check_due():
+            return False
+        return self._reload_context(force)
+
+    async def arefresh_context(self) -> bool:
+        """
+        refresh_context for chat turns on the event loop: the stat, the
+        context lock and any PDF re-parse run in a worker thread, so a
+        turn never waits on them in the loop itself
+        """
+        if not self._context_check_due():
+            return False
+        return await asyncio.to_thread(self._reload_context, False)
+
+    def _reload_context(self, force: bool) -> bool:
+        mtimes = (self._mtime(self.resume_path), self._mtime(self.summary_path))
+        if not force and mtimes == self._context_mtimes:
+            return False
+
+        with self._context_lock:
+            if not force and mtimes == self._context_mtimes:
+                return False
+
+            resume_bytes = self._read_bytes(self.resume_path)
+            summary_bytes = self._read_bytes(self.summary_path)
+            digest = source_digest(resume_bytes, summary_bytes)
+            self._context_mtimes = mtimes
+
+            if not force and digest == self._context_digest:
+                return False
+
+            prebuilt = load_artifact(self.artifact_path, digest)
+            if prebuilt is not None:
+                resume, summary = prebuilt
+            else:
+                resume, summary = self._extract_context(resume_bytes, summary_bytes)
+
+            self.index.replace_source("resume", resume, header="Resume")
+            self.index.replace_source("summary", summary, header="Summary")
+            self._context_digest = digest
+            if self.response_cache is not None:
+                self.response_cache.clear()
+            print(f"Chatbot context loaded (version {self.prompt_version})")
+            return True
+
+    @staticmethod
+    def _extract_context(resume_bytes: bytes, summary_bytes: bytes) -> tuple:
         resume = ""
+        summary = ""
         try:
-            if os.path.exists(resume_path):
-                reader = PdfReader(resume_path)
-                resume = "".join([p.extract_text() or "" for p in reader.pages])
+            if resume_bytes:
+                resume = extract_resume_text(resume_bytes)
         except Exception as e:
             print(f"Resume read error: {e}")
 
         try:
-            if os.path.exists(summary_path):
-                with open(summary_path, "r", encoding="utf-8") as f:
-                    summary = f.read()
+            summary = summary_bytes.decode("utf-8")
         except Exception as e:
             print(f"Summary read error: {e}")
+        return resume, summary
 
-        name = "Sohail Shaik"
-        self.system_prompt = self._build_system_prompt(
-            name=name, summary=summary, resume=resume
-        )
-        # tools list needs to be cast for the OpenAI SDK type checker
-        self.tools: List[ChatCompletionToolParam] = self._define_tools()  # type: ignore
+    def index_projects(self, projects) -> None:
+        """Bulk-load project rows into the retrieval index (startup)"""
+        for project in projects:
+            self.index.upsert_project(project)
+
+    def on_project_write(self, action: str, project_id: int, project=None) -> None:
+        """crud/project.py write listener: keep the index in step with the table"""
+        if action == "delete" or project is None:
+            self.index.remove_project(project_id)
+        else:
+            self.index.upsert_project(project)
+        if self.response_cache is not None:
+            self.response_cache.clear()
 
     def _push_notification(self, message: str):
         """Send push notification via Pushover"""
@@ -70,6 +285,8 @@ class ChatbotService:
                     "token": self.pushover_token,
                     "message": message,
                 }
+                import requests
+
                 response = requests.post(self.pushover_url, data=payload, timeout=5)
                 print(f"Pushover response: {response.status_code} {response.text}")
             except Exception as e:
@@ -79,141 +296,195 @@ class ChatbotService:
                 f"Pushover skipped: user={bool(self.pushover_user)} token={bool(self.pushover_token)}"
             )
 
+    def _notify(self, message: str, coalesce_key: Optional[str] = None):
+        """Hand off to the background dispatcher, or push inline without one"""
+        if self.notifier is not None:
+            self.notifier.enqueue(message, coalesce_key=coalesce_key)
+        else:
+            self._push_notification(message)
+
     def _record_user_details(
         self, email: str, name: str = "Not provided", notes: str = "Not provided"
     ):
         """Tool function: Record user contact information"""
-        print(f"DEBUG tool called: record_user_details email={email} name={name}")
-        self._push_notification(f"📧 New contact: {name} ({email})\nNotes: {notes}")
+        self._notify(f"📧 New contact: {name} ({email})\nNotes: {notes}")
         return {"recorded": "ok", "message": "Thank you! I'll get back to you soon."}
 
     def _record_unknown_question(self, question: str):
         """Tool function: Record questions the AI couldn't answer"""
-        print(f"DEBUG tool called: record_unknown_question question={question}")
-        self._push_notification(f"❓ Unknown question: {question}")
+        self._notify(
+            f"❓ Unknown question: {question}", coalesce_key="unknown_question"
+        )
         return {"recorded": "ok"}
 
-    def _define_tools(self) -> List[Dict[str, Any]]:
-        """Define schema for available tools"""
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "record_user_details",
-                    "description": "Call this when a user wants to connect, hire, or leave their contact details.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "email": {
-                                "type": "string",
-                                "description": "User email address",
-                            },
-                            "name": {"type": "string", "description": "User's name"},
-                            "notes": {
-                                "type": "string",
-                                "description": "Context about why they want to connect",
-                            },
+    def _build_tool_registry(self, timeout: float) -> ToolRegistry:
+        """Tools the model may call; handlers run concurrently per turn"""
+        registry = ToolRegistry(default_timeout=timeout)
+        registry.register(
+            Tool(
+                name="record_user_details",
+                description="Call this when a user wants to connect, hire, or leave their contact details.",
+                parameters={
+                    "type": "object",
+                    "properties": {
+                        "email": {
+                            "type": "string",
+                            "description": "User email address",
+                        },
+                        "name": {"type": "string", "description": "User's name"},
+                        "notes": {
+                            "type": "string",
+                            "description": "Context about why they want to connect",
                         },
-                        "required": ["email"],
-                        "additionalProperties": False,
                     },
+                    "required": ["email"],
+                    "additionalProperties": False,
                 },
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "record_unknown_question",
-                    "description": "Call this if you are asked a specific technical or personal question about Sohail that is not in your context.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "question": {
-                                "type": "string",
-                                "description": "The unanswered question",
-                            }
-                        },
-                        "required": ["question"],
-                        "additionalProperties": False,
+                handler=self._record_user_details,
+            )
+        )
+        registry.register(
+            Tool(
+                name="record_unknown_question",
+                description="Call this if you are asked a specific technical or personal question about Sohail that is not in your context.",
+                parameters={
+                    "type": "object",
+                    "properties": {
+                        "question": {
+                            "type": "string",
+                            "description": "The unanswered question",
+                        }
                     },
+                    "required": ["question"],
+                    "additionalProperties": False,
                 },
-            },
-        ]
+                handler=self._record_unknown_question,
+            )
+        )
+        return registry
 
-    def _build_system_prompt(self, name, summary, resume) -> str:
+    def _build_system_prompt(self, name, context) -> str:
         system_prompt = f"You are acting as {name}. You are answering questions on {name}'s website, \
         particularly questions related to {name}'s career, background, skills and experience. \
         Your responsibility is to represent {name} for interactions on the website as faithfully as possible. \
-        You are given a summary of {name}'s background and LinkedIn profile which you can use to answer questions. \
+        You are given excerpts from {name}'s summary, resume and project write-ups that are relevant to the question, which you can use to answer questions. \
         Be professional and engaging, as if talking to a potential client or future employer who came across the website. \
         If you don't know the answer to any question, use your record_unknown_question tool to record the question that you couldn't answer, even if it's about something trivial or unrelated to career. \
         If the user is engaging in discussion, try to steer them towards getting in touch via email; ask for their email and record it using your record_user_details tool. "
 
-        system_prompt += f"\n\n## Summary:\n{summary}\n\n## Resume:\n{resume}\n\n"
+        system_prompt += f"\n\n## Context:\n{context}\n\n"
         system_prompt += f"With this context, please chat with the user, always staying in character as {name}."
 
         return system_prompt
 
-    def _handle_tool_calls(self, tool_calls) -> List[Dict[str, Any]]:
-        results = []
-        for tool_call in tool_calls:
-            tool_name = tool_call.function.name
-            arguments = json.loads(tool_call.function.arguments)
-            print(f"DEBUG handling tool: {tool_name} args={arguments}")
-
-            if tool_name == "record_user_details":
-                result = self._record_user_details(**arguments)
-            elif tool_name == "record_unknown_question":
-                result = self._record_unknown_question(**arguments)
-            else:
-                result = {"error": "Unknown tool"}
+    def _deadline(self) -> Optional[float]:
+        return time.monotonic() + self.turn_deadline if self.turn_deadline > 0 else None
 
-            results.append(
-                {
-                    "role": "tool",
-                    "content": json.dumps(result),
-                    "tool_call_id": tool_call.id,
-                }
-            )
-        return results
+    def _completion_args(self, messages, rounds: int) -> Dict[str, Any]:
+        """Request kwargs; past max_tool_rounds the model may not call tools"""
+        args: Dict[str, Any] = {
+            "messages": messages,
+            "tools": self.tools,
+        }
+        if rounds > self.max_tool_rounds:
+            args["tool_choice"] = "none"
+        return args
 
-    def chat(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> str:
-        """Main chat entry point with tool loop"""
+    @contextmanager
+    def _llm_call(self, mode: str):
+        """Times one upstream completion; set call["model"] and call["usage"] inside"""
+        call: Dict[str, Any] = {"model": self.model_name, "usage": None}
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield call
+            outcome = "ok"
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = "cancelled"
+            raise
+        finally:
+            model = call["model"]
+            LLM_REQUESTS.inc((model, mode, outcome))
+            LLM_LATENCY.observe(time.perf_counter() - started, (model, mode))
+            usage = call["usage"]
+            if usage is not None:
+                LLM_TOKENS.inc((model, "prompt"), usage.prompt_tokens or 0)
+                LLM_TOKENS.inc((model, "completion"), usage.completion_tokens or 0)
+
+    def _build_messages(
+        self, message: str, history: Optional[List[Dict[str, str]]] = None
+    ) -> List["ChatCompletionMessageParam"]:
+        """System prompt + sanitized history + the new user message"""
         safe_history = history if history is not None else []
 
-        # Build message history for the API
-        messages: List[ChatCompletionMessageParam] = [
-            {"role": "system", "content": self.system_prompt}
-        ]
+        chunks = self.index.search(
+            build_query(message, safe_history), k=self.retrieval_top_k
+        )
+        system_prompt = self._build_system_prompt(
+            name=self.name, context=format_chunks(chunks)
+        )
+
+        # Ensure history is strictly role/content and within the token budget
+        summary, recent = self.history_compactor.compact(safe_history)
 
-        # Ensure history is strictly role/content to avoid Pydantic extra fields
-        for msg in safe_history:
-            if msg.get("role") in ["user", "assistant"]:
-                messages.append({"role": msg["role"], "content": msg["content"]})  # type: ignore
+        # Build message history for the API; the summary is visitor text,
+        # so it goes in as a quoted user message, never into the system prompt
+        messages: List["ChatCompletionMessageParam"] = [
+            {"role": "system", "content": system_prompt}
+        ]
+        if summary:
+            messages.append(summary_message(summary))  # type: ignore
+        messages.extend(recent)  # type: ignore
 
         messages.append({"role": "user", "content": message})
+        return messages
+
+    def _cache_key(
+        self,
+        message: str,
+        history: Optional[List[Dict[str, str]]],
+        messages: List["ChatCompletionMessageParam"],
+    ) -> Optional[str]:
+        """Cache key for history-free/short-history turns, else None"""
+        history = history or []
+        if self.response_cache is None or len(history) > self.cache_max_history:
+            return None
+        system_prompt = messages[0]["content"]  # type: ignore
+        return make_cache_key(message, history, str(system_prompt))
+
+    def chat(self, message: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Main chat entry point with tool loop (blocking; for scripts and notebooks)"""
+        self.refresh_context()
+        messages = self._build_messages(message, history)
+        deadline = self._deadline()
+        rounds = 0
 
         try:
             done = False
             final_response = "I'm having trouble processing that right now."
 
             while not done:
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=messages,
-                    tools=self.tools,  # type: ignore
-                )
+                rounds += 1
+                with self._llm_call("sync") as call:
+                    call["model"], response = self.llm.create(
+                        deadline=deadline, **self._completion_args(messages, rounds)
+                    )
+                    call["usage"] = response.usage
 
                 choice = response.choices[0]
                 message_obj = choice.message
 
-                print(f"DEBUG finish_reason: {choice.finish_reason}")
-                print(f"DEBUG tool_calls: {message_obj.tool_calls}")
-
-                if choice.finish_reason == "tool_calls" and message_obj.tool_calls:
+                if (
+                    choice.finish_reason == "tool_calls"
+                    and message_obj.tool_calls
+                    and rounds <= self.max_tool_rounds
+                ):
                     # Must append the assistant message that requested tool calls first
                     messages.append(message_obj)  # type: ignore
 
-                    tool_results = self._handle_tool_calls(message_obj.tool_calls)
+                    tool_results = self.tool_registry.run(
+                        message_obj.tool_calls, deadline
+                    )
                     messages.extend(tool_results)  # type: ignore
                 else:
                     final_response = (
@@ -221,8 +492,270 @@ class ChatbotService:
                     )
                     done = True
 
+            CHAT_TURNS.inc(("sync", "answered"))
             return final_response
 
+        except DeadlineExceeded:
+            CHAT_TURNS.inc(("sync", "timeout"))
+            return TIMEOUT_REPLY
+        except LLMUnavailable:
+            CHAT_TURNS.inc(("sync", "unavailable"))
+            return UNAVAILABLE_REPLY
         except Exception as e:
             print(f"OpenAI/Gemini Call Error: {e}")
+            CHAT_TURNS.inc(("sync", "error"))
             return f"Error: {str(e)}"
+        finally:
+            CHAT_ROUND_TRIPS.observe(rounds, ("sync",))
+
+    async def achat(
+        self, message: str, history: Optional[List[Dict[str, str]]] = None
+    ) -> ChatAnswer:
+        """
+        Async chat entry point with tool loop, used by the API routes.
+        Raises ChatTurnFailed (timeout, model unavailable, upstream error)
+        instead of returning its apology as if it were an answer.
+
+        Only history-free turns are coalesced: identical first questions
+        asked at the same time share one upstream turn, keyed on the
+        response-cache key (normalized question plus prompt context hash).
+        Turns with history, turns with the response cache disabled and
+        astream_chat always run on their own.
+        """
+        await self.arefresh_context()
+        messages = self._build_messages(message, history)
+        cache_key = self._cache_key(message, history, messages)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)  # type: ignore
+            if cached is not None:
+                CHAT_TURNS.inc(("chat", "cached"))
+                return cached
+
+        # Any history makes the turn conversation-specific; never share it
+        if cache_key is not None and not history:
+            answer, shared = await self.turns.do(
+                cache_key, lambda: self._achat_turn(messages, cache_key)
+            )
+            if shared:
+                CHAT_TURNS.inc(("chat", "coalesced"))
+            return answer
+        return await self._achat_turn(messages, cache_key)
+
+    async def _achat_turn(self, messages, cache_key: Optional[str]) -> ChatAnswer:
+        """The tool loop behind achat; may be shared by coalesced callers"""
+        deadline = self._deadline()
+        rounds = 0
+        try:
+            done = False
+            used_tools = False
+            final_response = "I'm having trouble processing that right now."
+            served_by = self.model_name
+
+            while not done:
+                rounds += 1
+                with self._llm_call("chat") as call:
+                    call["model"], response = await self.llm.acreate(
+                        deadline=deadline, **self._completion_args(messages, rounds)
+                    )
+                    call["usage"] = response.usage
+                # The fallback model may have answered this round
+                served_by = call["model"]
+
+                choice = response.choices[0]
+                message_obj = choice.message
+
+                if (
+                    choice.finish_reason == "tool_calls"
+                    and message_obj.tool_calls
+                    and rounds <= self.max_tool_rounds
+                ):
+                    messages.append(message_obj)  # type: ignore
+                    used_tools = True
+
+                    tool_results = await self.tool_registry.arun(
+                        message_obj.tool_calls, deadline
+                    )
+                    messages.extend(tool_results)  # type: ignore
+                else:
+                    final_response = (
+                        message_obj.content or "I've processed your request."
+                    )
+                    done = True
+
+            answer = ChatAnswer(final_response, served_by)
+            # Tool turns have side effects (notifications) and must not be replayed
+            if cache_key is not None and not used_tools and message_obj.content:
+                self.response_cache.set(cache_key, answer)  # type: ignore
+
+            CHAT_TURNS.inc(("chat", "answered"))
+            return answer
+
+        except (DeadlineExceeded, asyncio.TimeoutError):
+            CHAT_TURNS.inc(("chat", "timeout"))
+            raise ChatTurnFailed(TIMEOUT_REPLY, "timeout") from None
+        except LLMUnavailable:
+            CHAT_TURNS.inc(("chat", "unavailable"))
+            raise ChatTurnFailed(UNAVAILABLE_REPLY, "unavailable") from None
+        except Exception as e:
+            print(f"OpenAI/Gemini Call Error: {e}")
+            CHAT_TURNS.inc(("chat", "error"))
+            raise ChatTurnFailed(f"Error: {str(e)}", "error") from e
+        finally:
+            CHAT_ROUND_TRIPS.observe(rounds, ("chat",))
+
+    async def astream_chat(
+        self, message: str, history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of achat. Yields events as dicts:
+        {"event": "delta", "data": {"content": ...}} for each token chunk,
+        {"event": "tool", "data": {"names": [...]}} when a tool round runs,
+        {"event": "done", "data": {"finish_reason": ..., "usage": {...}, "model": ...}}
+        at the end, naming the model that answered,
+        {"event": "error", "data": {"detail": ...}} if the upstream call fails.
+        """
+        await self.arefresh_context()
+        messages = self._build_messages(message, history)
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+        cache_key = self._cache_key(message, history, messages)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)  # type: ignore
+            if cached is not None:
+                CHAT_TURNS.inc(("stream", "cached"))
+                yield {"event": "delta", "data": {"content": cached.text}}
+                yield {
+                    "event": "done",
+                    "data": {
+                        "finish_reason": "stop",
+                        "usage": usage,
+                        "model": cached.model,
+                        "cached": True,
+                    },
+                }
+                return
+
+        used_tools = False
+        deadline = self._deadline()
+        rounds = 0
+        try:
+            while True:
+                rounds += 1
+                with self._llm_call("stream") as call:
+                    call["model"], stream = await self.llm.acreate(
+                        deadline=deadline,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **self._completion_args(messages, rounds),
+                    )
+
+                    content_parts: List[str] = []
+                    pending: Dict[int, Dict[str, str]] = {}
+                    finish_reason = None
+
+                    # A stalled stream must not outlive the turn deadline either
+                    chunks = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(
+                                chunks.__anext__(), time_left(deadline)
+                            )
+                        except StopAsyncIteration:
+                            break
+                        if chunk.usage:
+                            call["usage"] = chunk.usage
+                            usage["prompt_tokens"] += chunk.usage.prompt_tokens or 0
+                            usage["completion_tokens"] += (
+                                chunk.usage.completion_tokens or 0
+                            )
+                            usage["total_tokens"] += chunk.usage.total_tokens or 0
+                        if not chunk.choices:
+                            continue
+
+                        choice = chunk.choices[0]
+                        delta = choice.delta
+                        if delta.content:
+                            content_parts.append(delta.content)
+                            yield {"event": "delta", "data": {"content": delta.content}}
+
+                        # Tool calls arrive as fragments keyed by index; stitch them together
+                        for position, fragment in enumerate(delta.tool_calls or []):
+                            index = (
+                                fragment.index
+                                if fragment.index is not None
+                                else position
+                            )
+                            slot = pending.setdefault(
+                                index, {"id": "", "name": "", "arguments": ""}
+                            )
+                            if fragment.id:
+                                slot["id"] = fragment.id
+                            if fragment.function:
+                                slot["name"] += fragment.function.name or ""
+                                slot["arguments"] += fragment.function.arguments or ""
+
+                        if choice.finish_reason:
+                            finish_reason = choice.finish_reason
+
+                if not pending or rounds > self.max_tool_rounds:
+                    answer = ChatAnswer("".join(content_parts), call["model"])
+                    if cache_key is not None and not used_tools and answer.text:
+                        self.response_cache.set(cache_key, answer)  # type: ignore
+                    CHAT_TURNS.inc(("stream", "answered"))
+                    yield {
+                        "event": "done",
+                        "data": {
+                            "finish_reason": finish_reason,
+                            "usage": usage,
+                            "model": answer.model,
+                        },
+                    }
+                    return
+
+                from openai.types.chat import ChatCompletionMessageFunctionToolCall
+                from openai.types.chat.chat_completion_message_function_tool_call import (
+                    Function,
+                )
+
+                tool_calls = [
+                    ChatCompletionMessageFunctionToolCall(
+                        id=slot["id"] or f"call_{index}",
+                        type="function",
+                        function=Function(
+                            name=slot["name"], arguments=slot["arguments"] or "{}"
+                        ),
+                    )
+                    for index, slot in sorted(pending.items())
+                ]
+                messages.append(
+                    {
+                        "role": "assistant",
+                        "content": "".join(content_parts) or None,
+                        "tool_calls": [call.model_dump() for call in tool_calls],
+                    }  # type: ignore
+                )
+                used_tools = True
+                yield {
+                    "event": "tool",
+                    "data": {"names": [call.function.name for call in tool_calls]},
+                }
+                tool_results = await self.tool_registry.arun(tool_calls, deadline)
+                messages.extend(tool_results)  # type: ignore
+
+        except (DeadlineExceeded, asyncio.TimeoutError):
+            CHAT_TURNS.inc(("stream", "timeout"))
+            yield {"event": "error", "data": {"detail": TIMEOUT_REPLY}}
+        except LLMUnavailable:
+            CHAT_TURNS.inc(("stream", "unavailable"))
+            yield {"event": "error", "data": {"detail": UNAVAILABLE_REPLY}}
+        except Exception as e:
+            print(f"OpenAI/Gemini Stream Error: {e}")
+            CHAT_TURNS.inc(("stream", "error"))
+            yield {"event": "error", "data": {"detail": str(e)}}
+        finally:
+            CHAT_ROUND_TRIPS.observe(rounds, ("stream",))
+
+    async def aclose(self):
+        """Release pooled HTTP connections (called on app shutdown)"""
+        await self.llm.aclose()
+        self.tool_registry.shutdown()
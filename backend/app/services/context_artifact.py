@@ -0,0 +1,60 @@
+"""
+Chatbot Context Artifact
+Resume and summary text extracted once at build time (see build_context.py),
+so a cold start reads one small JSON file instead of parsing the PDF
+"""
+
+import hashlib
+import io
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+ARTIFACT_NAME = "context.json"
+ARTIFACT_FORMAT = 1
+
+
+def source_digest(resume_bytes: bytes, summary_bytes: bytes) -> str:
+    return hashlib.sha256(resume_bytes + b"\0" + summary_bytes).hexdigest()
+
+
+def extract_resume_text(resume_bytes: bytes) -> str:
+    # pypdf is only needed when there is no up-to-date artifact
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(resume_bytes))
+    return "".join([p.extract_text() or "" for p in reader.pages])
+
+
+def load_artifact(path: str, digest: str) -> Optional[Tuple[str, str]]:
+    """(resume, summary) if the artifact was built from the same sources"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != ARTIFACT_FORMAT or data.get("digest") != digest:
+        return None
+    return data.get("resume", ""), data.get("summary", "")
+
+
+def build_artifact(resume_path: str, summary_path: str, out_path: str) -> Dict:
+    with open(resume_path, "rb") as f:
+        resume_bytes = f.read()
+    try:
+        with open(summary_path, "rb") as f:
+            summary_bytes = f.read()
+    except OSError:
+        summary_bytes = b""
+
+    data = {
+        "format": ARTIFACT_FORMAT,
+        "digest": source_digest(resume_bytes, summary_bytes),
+        "resume": extract_resume_text(resume_bytes),
+        "summary": summary_bytes.decode("utf-8"),
+    }
+    tmp = f"{out_path}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, out_path)
+    return data
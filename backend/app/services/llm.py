@@ -0,0 +1,623 @@
+"""
+LLM Providers
+Chat completion backends behind one router with deadlines, retries, a
+circuit breaker per model and an optional fallback model
+
+- OpenAIProvider: any OpenAI-compatible endpoint (Gemini by default). All
+  API keys share one pooled httpx client and are used round-robin.
+- LocalProvider: deterministic offline replies for tests and benchmarks
+"""
+
+import asyncio
+import json
+import random
+import re
+import sys
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from core.metrics import Counter, Gauge
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+# Statuses worth another attempt; other 4xx responses will fail the same way
+RETRY_STATUSES = (408, 409, 429)
+
+LLM_RETRIES = Counter(
+    "chatbot_llm_retries_total",
+    "Upstream attempts retried after a transient error.",
+    ("model",),
+)
+LLM_FALLBACKS = Counter(
+    "chatbot_llm_fallbacks_total",
+    "Calls that moved on to the next model (error or circuit_open).",
+    ("model", "reason"),
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The caller's deadline ran out before the upstream answered"""
+
+
+class LLMUnavailable(RuntimeError):
+    """No model could be tried: every circuit is open"""
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until a time.monotonic() deadline; raises once it has passed"""
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    return remaining
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Timeouts, dropped connections, 408/409/429 and 5xx responses"""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRY_STATUSES or status >= 500
+    # Only an OpenAIProvider raises these, and it has imported openai already
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(exc, openai.APIConnectionError)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures. Once
+    `reset_seconds` have passed one probe call is let through (half-open);
+    its outcome closes the circuit or opens it again. A probe that never
+    reports back is replaced after another `reset_seconds`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if now - self._opened_at < self.reset_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_at = None
+            if self._probe_at is None or now - self._probe_at >= self.reset_seconds:
+                self._probe_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_at = None
+
+    def record_failure(self):
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_at = None
+
+
+class LLMProvider:
+    """One chat completion against `model`; stream=True returns the chunk iterator"""
+
+    name = "base"
+
+    async def acreate(self, model: str, timeout: Optional[float], **kwargs) -> Any:
+        raise NotImplementedError
+
+    def create(self, model: str, timeout: Optional[float], **kwargs) -> Any:
+        raise NotImplementedError
+
+    async def aclose(self):
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    """
+    OpenAI SDK clients, one per API key, over a shared connection pool. The
+    SDK's own retries are off (the router owns retries and fallback), and the
+    clients and pools are created on first use.
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_keys: Sequence[str],
+        base_url: str,
+        connect_timeout: float = 5.0,
+        max_connections: int = 20,
+    ):
+        if not api_keys:
+            raise ValueError("OpenAIProvider needs at least one API key")
+        self.api_keys = list(api_keys)
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self._turn = -1
+        self._lock = threading.Lock()
+        self._http: Optional["httpx.Client"] = None
+        self._async_http: Optional["httpx.AsyncClient"] = None
+        self._clients: Optional[List["OpenAI"]] = None
+        self._async_clients: Optional[List["AsyncOpenAI"]] = None
+
+    def _next_key(self) -> int:
+        with self._lock:
+            self._turn = (self._turn + 1) % len(self.api_keys)
+            return self._turn
+
+    def _pool_options(self) -> Dict[str, Any]:
+        import httpx
+
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            "timeout": httpx.Timeout(60.0, connect=self.connect_timeout),
+        }
+
+    def _timeout(self, timeout: Optional[float]):
+        import httpx
+
+        if timeout is None:
+            return httpx.Timeout(60.0, connect=self.connect_timeout)
+        return httpx.Timeout(timeout, connect=min(self.connect_timeout, timeout))
+
+    def _async_client(self) -> "AsyncOpenAI":
+        if self._async_clients is None:
+            with self._lock:
+                if self._async_clients is None:
+                    import httpx
+                    from openai import AsyncOpenAI
+
+                    self._async_http = httpx.AsyncClient(**self._pool_options())
+                    self._async_clients = [
+                        AsyncOpenAI(
+                            api_key=key,
+                            base_url=self.base_url,
+                            http_client=self._async_http,
+                            max_retries=0,
+                        )
+                        for key in self.api_keys
+                    ]
+        return self._async_clients[self._next_key()]
+
+    def _client(self) -> "OpenAI":
+        if self._clients is None:
+            with self._lock:
+                if self._clients is None:
+                    import httpx
+                    from openai import OpenAI
+
+                    self._http = httpx.Client(**self._pool_options())
+                    self._clients = [
+                        OpenAI(
+                            api_key=key,
+                            base_url=self.base_url,
+                            http_client=self._http,
+                            max_retries=0,
+                        )
+                        for key in self.api_keys
+                    ]
+        return self._clients[self._next_key()]
+
+    async def acreate(self, model: str, timeout: Optional[float], **kwargs) -> Any:
+        return await self._async_client().chat.completions.create(
+            model=model, timeout=self._timeout(timeout), **kwargs
+        )
+
+    def create(self, model: str, timeout: Optional[float], **kwargs) -> Any:
+        return self._client().chat.completions.create(
+            model=model, timeout=self._timeout(timeout), **kwargs
+        )
+
+    async def aclose(self):
+        if self._async_http is not None:
+            await self._async_http.aclose()
+        if self._http is not None:
+            self._http.close()
+
+
+def _field(message, name: str):
+    if isinstance(message, dict):
+        return message.get(name)
+    return getattr(message, name, None)
+
+
+class LocalProvider(LLMProvider):
+    """
+    Offline stand-in with deterministic output. The reply echoes the last
+    user message; a message containing an email address triggers one
+    record_user_details call when that tool is offered. `latency` and
+    `fail_first` (calls that raise ConnectionError) simulate a slow or
+    flaky upstream.
+    """
+
+    name = "local"
+    EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+    def __init__(self, latency: float = 0.0, fail_first: int = 0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _reply(self, model: str, messages, tools, tool_choice) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+        if call_number <= self.fail_first:
+            raise ConnectionError("local provider: simulated upstream failure")
+
+        last = messages[-1]
+        message: Dict[str, Any] = {"role": "assistant", "content": None}
+        tool_names = {tool["function"]["name"] for tool in tools or []}
+        email = None
+        if _field(last, "role") == "user":
+            email = self.EMAIL.search(str(_field(last, "content") or ""))
+        if email and "record_user_details" in tool_names and tool_choice != "none":
+            message["tool_calls"] = [
+                {
+                    "id": f"local-call-{call_number}",
+                    "type": "function",
+                    "function": {
+                        "name": "record_user_details",
+                        "arguments": json.dumps({"email": email.group(0)}),
+                    },
+                }
+            ]
+        elif _field(last, "role") == "tool":
+            message["content"] = f"[{model}] Thanks, I've noted that."
+        else:
+            message["content"] = f"[{model}] You said: {_field(last, 'content')}"
+
+        prompt_tokens = sum(
+            len(str(_field(m, "content") or "").split()) for m in messages
+        )
+        completion_tokens = len((message["content"] or "").split())
+        return {
+            "id": f"local-{call_number}",
+            "created": 0,
+            "model": model,
+            "message": message,
+            "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @staticmethod
+    def _completion(reply: Dict[str, Any]):
+        from openai.types.chat import ChatCompletion
+
+        return ChatCompletion.model_validate(
+            {
+                "id": reply["id"],
+                "object": "chat.completion",
+                "created": reply["created"],
+                "model": reply["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": reply["message"],
+                        "finish_reason": reply["finish_reason"],
+                    }
+                ],
+                "usage": reply["usage"],
+            }
+        )
+
+    @staticmethod
+    def _chunks(reply: Dict[str, Any], include_usage: bool) -> list:
+        from openai.types.chat import ChatCompletionChunk
+
+        def chunk(delta, finish_reason=None, usage=None, choices=True):
+            return ChatCompletionChunk.model_validate(
+                {
+                    "id": reply["id"],
+                    "object": "chat.completion.chunk",
+                    "created": reply["created"],
+                    "model": reply["model"],
+                    "choices": (
+                        [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                        if choices
+                        else []
+                    ),
+                    "usage": usage,
+                }
+            )
+
+        message = reply["message"]
+        chunks = [
+            chunk({"content": word})
+            for word in re.findall(r"\S+\s*", message["content"] or "")
+        ]
+        for index, call in enumerate(message.get("tool_calls") or []):
+            chunks.append(chunk({"tool_calls": [{"index": index, **call}]}))
+        chunks.append(chunk({}, finish_reason=reply["finish_reason"]))
+        if include_usage:
+            chunks.append(chunk({}, usage=reply["usage"], choices=False))
+        return chunks
+
+    def _respond(self, model: str, kwargs: Dict[str, Any]):
+        reply = self._reply(
+            model, kwargs["messages"], kwargs.get("tools"), kwargs.get("tool_choice")
+        )
+        if not kwargs.get("stream"):
+            return self._completion(reply)
+        include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+        return self._chunks(reply, include_usage)
+
+    async def acreate(self, model: str, timeout: Optional[float], **kwargs) -> Any:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self._respond(model, kwargs)
+        if not kwargs.get("stream"):
+            return response
+
+        async def stream():
+            for chunk in response:
+                yield chunk
+
+        return stream()
+
+    def create(self, model: str, timeout: Optional[float], **kwargs) -> Any:
+        if self.latency:
+            time.sleep(self.latency)
+        response = self._respond(model, kwargs)
+        return iter(response) if kwargs.get("stream") else response
+
+
+class LLMRoute:
+    def __init__(self, provider: LLMProvider, model: str, breaker: CircuitBreaker):
+        self.provider = provider
+        self.model = model
+        self.breaker = breaker
+
+
+class LLMRouter:
+    """
+    Sends each request to the first route (primary model, then fallbacks)
+    whose circuit allows it. An attempt gets min(request_timeout, time left
+    before `deadline`). Transient errors are retried on the same route with
+    jittered exponential backoff, honouring Retry-After; when retries run
+    out, the circuit opens, or the backoff would not fit before the
+    deadline, the next route is tried. Other errors are raised as they are.
+    Streams are retried only until the stream is open.
+    """
+
+    def __init__(
+        self,
+        routes: Sequence[LLMRoute],
+        request_timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+    ):
+        if not routes:
+            raise ValueError("LLMRouter needs at least one route")
+        self.routes = list(routes)
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        _ROUTERS.add(self)
+
+    @property
+    def model(self) -> str:
+        return self.routes[0].model
+
+    def _attempt_timeout(self, deadline: Optional[float]) -> float:
+        remaining = time_left(deadline)
+        if remaining is None:
+            return self.request_timeout
+        return min(self.request_timeout, remaining)
+
+    def _on_error(
+        self, route: LLMRoute, exc: Exception, attempt: int, deadline: Optional[float]
+    ) -> Optional[float]:
+        """Backoff before retrying `route`, or None to move on; re-raises the rest"""
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded() from exc
+        if not is_transient(exc):
+            # The upstream answered; it is the request that is wrong
+            route.breaker.record_success()
+            raise exc
+        route.breaker.record_failure()
+        print(f"LLM {route.model} attempt {attempt + 1} failed: {exc!r}")
+
+        if attempt >= self.max_retries or not route.breaker.allow():
+            return None
+        delay = self.backoff_base * (2**attempt)
+        delay = min(delay + random.uniform(0, delay / 2), self.backoff_max)
+        hinted = retry_after(exc)
+        if hinted is not None:
+            if hinted > self.backoff_max:
+                return None
+            delay = max(delay, hinted)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _skip(self, route: LLMRoute) -> bool:
+        if route.breaker.allow():
+            return False
+        LLM_FALLBACKS.inc((route.model, "circuit_open"))
+        return True
+
+    def _unavailable(self, error: Optional[Exception]) -> Exception:
+        return error or LLMUnavailable("No upstream model available (circuits open)")
+
+    async def acreate(
+        self, deadline: Optional[float] = None, **kwargs
+    ) -> Tuple[str, Any]:
+        """(model that answered, response) for one chat completion request"""
+        error: Optional[Exception] = None
+        for route in self.routes:
+            if self._skip(route):
+                continue
+            attempt = 0
+            while True:
+                timeout = self._attempt_timeout(deadline)
+                try:
+                    response = await asyncio.wait_for(
+                        route.provider.acreate(route.model, timeout, **kwargs), timeout
+                    )
+                except Exception as e:
+                    error = e
+                    delay = self._on_error(route, e, attempt, deadline)
+                    if delay is None:
+                        LLM_FALLBACKS.inc((route.model, "error"))
+                        break
+                    LLM_RETRIES.inc((route.model,))
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                route.breaker.record_success()
+                return route.model, response
+        raise self._unavailable(error)
+
+    def create(self, deadline: Optional[float] = None, **kwargs) -> Tuple[str, Any]:
+        """Blocking twin of acreate() for ChatbotService.chat"""
+        error: Optional[Exception] = None
+        for route in self.routes:
+            if self._skip(route):
+                continue
+            attempt = 0
+            while True:
+                timeout = self._attempt_timeout(deadline)
+                try:
+                    response = route.provider.create(route.model, timeout, **kwargs)
+                except Exception as e:
+                    error = e
+                    delay = self._on_error(route, e, attempt, deadline)
+                    if delay is None:
+                        LLM_FALLBACKS.inc((route.model, "error"))
+                        break
+                    LLM_RETRIES.inc((route.model,))
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                route.breaker.record_success()
+                return route.model, response
+        raise self._unavailable(error)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "provider": route.provider.name,
+                "model": route.model,
+                "circuit": route.breaker.state,
+            }
+            for route in self.routes
+        ]
+
+    async def aclose(self):
+        providers = {id(route.provider): route.provider for route in self.routes}
+        for provider in providers.values():
+            await provider.aclose()
+
+
+_ROUTERS: "weakref.WeakSet[LLMRouter]" = weakref.WeakSet()
+_CIRCUIT_VALUES = {
+    CircuitBreaker.CLOSED: 0,
+    CircuitBreaker.HALF_OPEN: 1,
+    CircuitBreaker.OPEN: 2,
+}
+
+
+def _circuit_samples():
+    for router in list(_ROUTERS):
+        for route in router.routes:
+            yield (route.model,), _CIRCUIT_VALUES[route.breaker.state]
+
+
+Gauge(
+    "chatbot_llm_circuit_state",
+    "Circuit breaker per model: 0 closed, 1 half-open, 2 open.",
+    ("model",),
+    _circuit_samples,
+)
+
+
+def create_llm_router(
+    provider: str,
+    api_keys: Sequence[str],
+    base_url: str,
+    model: str,
+    fallback_model: str = "",
+    request_timeout: float = 30.0,
+    connect_timeout: float = 5.0,
+    max_connections: int = 20,
+    max_retries: int = 2,
+    backoff_base: float = 0.5,
+    backoff_max: float = 4.0,
+    breaker_failures: int = 5,
+    breaker_reset_seconds: float = 30.0,
+) -> LLMRouter:
+    backend: LLMProvider
+    if provider == "local":
+        backend = LocalProvider()
+    elif provider in ("gemini", "openai"):
+        backend = OpenAIProvider(
+            api_keys,
+            base_url,
+            connect_timeout=connect_timeout,
+            max_connections=max_connections,
+        )
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    models = [model]
+    if fallback_model and fallback_model != model:
+        models.append(fallback_model)
+    routes = [
+        LLMRoute(backend, name, CircuitBreaker(breaker_failures, breaker_reset_seconds))
+        for name in models
+    ]
+    return LLMRouter(
+        routes,
+        request_timeout=request_timeout,
+        max_retries=max_retries,
+        backoff_base=backoff_base,
+        backoff_max=backoff_max,
+    )
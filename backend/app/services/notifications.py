@@ -0,0 +1,287 @@
+"""
+Notification Dispatcher
+Background Pushover delivery with batching, coalescing, retries and a spill file
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+PUSHOVER_URL = "https://api.pushover.net/1/messages.json"
+
+
+class NotificationDispatcher:
+    """
+    In-process queue drained by a single worker task.
+
+    Request handlers call enqueue(), which never waits on the network. The
+    worker collects a batch for up to `batch_window` seconds, merges entries
+    sharing a coalesce key into one digest, and sends each resulting message
+    with bounded, jittered exponential backoff. Messages that still fail (or
+    are pending at shutdown) are appended to `spill_path` as NDJSON and
+    replayed on the next start.
+    """
+
+    def __init__(
+        self,
+        pushover_user: str = "",
+        pushover_token: str = "",
+        pushover_url: str = PUSHOVER_URL,
+        batch_window: float = 2.0,
+        max_batch: int = 50,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        queue_size: int = 1000,
+        spill_path: Optional[str] = None,
+    ):
+        self.pushover_user = pushover_user
+        self.pushover_token = pushover_token
+        self.pushover_url = pushover_url
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.spill_path = spill_path
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+        self.stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "failed": 0,
+            "dropped": 0,
+            "spilled": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.pushover_user and self.pushover_token)
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._http = httpx.AsyncClient(timeout=5)
+        for item in self._read_spill():
+            self._put(item)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """Flush what we can within drain_timeout, spill the rest"""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        leftovers = []
+        while not self._queue.empty():
+            leftovers.append(self._queue.get_nowait())
+            self._queue.task_done()
+        self._spill(leftovers)
+
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # --------------------------------------------------
+    # PRODUCER SIDE
+    # --------------------------------------------------
+    def enqueue(self, message: str, coalesce_key: Optional[str] = None):
+        """
+        Queue a notification without blocking. Entries with the same
+        coalesce_key that land in one batch window are merged into a digest.
+        Safe to call from the event loop or from worker threads.
+        """
+        item = {"message": message, "key": coalesce_key, "ts": time.time()}
+        self.stats["enqueued"] += 1
+
+        if self._loop is None:
+            # Not started (scripts/tests): keep the message rather than drop it
+            self._spill([item])
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self._put(item)
+        else:
+            self._loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item: Dict):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._spill([item])
+
+    # --------------------------------------------------
+    # WORKER
+    # --------------------------------------------------
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+
+            try:
+                while len(batch) < self.max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Cancelled inside the batch window: what was collected is owed too
+                self._spill(self._coalesce(batch))
+                for _ in batch:
+                    self._queue.task_done()
+                raise
+
+            unsent = self._coalesce(batch)
+            try:
+                while unsent:
+                    await self._send_with_retry(unsent[0])
+                    unsent.pop(0)
+            except asyncio.CancelledError:
+                # stop() gave up on draining: keep what this batch still owes
+                self._spill(unsent)
+                raise
+            except Exception as e:
+                print(f"Notification worker error: {e}")
+                self._spill(unsent)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _coalesce(self, batch: List[Dict]) -> List[Dict]:
+        """Merge same-key entries into one digest, keep the rest in order"""
+        groups: Dict[str, List[Dict]] = {}
+        out: List[Dict] = []
+        for item in batch:
+            key = item.get("key")
+            if key is None:
+                out.append(item)
+            elif key in groups:
+                groups[key].append(item)
+            else:
+                groups[key] = [item]
+                out.append({"key": key, "group": groups[key]})
+
+        merged = []
+        for item in out:
+            if "group" not in item:
+                merged.append(item)
+                continue
+            group = item["group"]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            self.stats["coalesced"] += len(group) - 1
+            lines = "\n".join(f"- {entry['message']}" for entry in group)
+            merged.append(
+                {
+                    "message": f"{len(group)} notifications ({item['key']}):\n{lines}",
+                    "key": item["key"],
+                    "ts": group[0]["ts"],
+                }
+            )
+        return merged
+
+    async def _send_with_retry(self, item: Dict):
+        if not self.enabled:
+            print(
+                f"Pushover skipped: user={bool(self.pushover_user)} token={bool(self.pushover_token)}"
+            )
+            return
+
+        payload = {
+            "user": self.pushover_user,
+            "token": self.pushover_token,
+            "message": item["message"][:1024],  # Pushover's message limit
+        }
+        for attempt in range(self.max_retries + 1):
+            try:
+                assert self._http is not None
+                response = await self._http.post(self.pushover_url, data=payload)
+                if response.status_code < 400:
+                    self.stats["sent"] += 1
+                    return
+                print(f"Pushover response: {response.status_code} {response.text}")
+                # 4xx other than rate limiting will not succeed on retry (or
+                # on replay), so the message is dropped rather than spilled
+                if response.status_code < 500 and response.status_code != 429:
+                    self.stats["dropped"] += 1
+                    return
+            except Exception as e:
+                print(f"Push notification failed (attempt {attempt + 1}): {e}")
+
+            if attempt < self.max_retries:
+                delay = self.backoff_base * (2**attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+        self.stats["failed"] += 1
+        self._spill([item])
+
+    # --------------------------------------------------
+    # SPILL FILE
+    # --------------------------------------------------
+    def _spill(self, items: List[Dict]):
+        if not items or not self.spill_path:
+            return
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            self.stats["spilled"] += len(items)
+        except OSError as e:
+            print(f"Notification spill error: {e}")
+
+    def _read_spill(self) -> List[Dict]:
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return []
+        items = []
+        bad_lines = 0
+        try:
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        items.append(json.loads(line))
+                    except ValueError:
+                        bad_lines += 1
+            # The parsed entries are re-queued now, so the file must go either
+            # way; a damaged one is kept aside for inspection
+            if bad_lines:
+                print(f"Notification spill: skipped {bad_lines} unreadable lines")
+                os.replace(self.spill_path, self.spill_path + ".corrupt")
+            else:
+                os.remove(self.spill_path)
+        except OSError as e:
+            print(f"Notification spill replay error: {e}")
+        return items
@@ -0,0 +1,127 @@
+"""
+Project Cache
+Process-local read-through cache of serialized project responses
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from core.config import PROJECT_CACHE_MAX_ENTRIES, PROJECT_CACHE_TTL_SECONDS
+
+
+class ProjectCache:
+    """
+    Stores ready-to-send response bytes for list pages and single projects.
+
+    Every entry remembers the version it was computed under. Writes bump
+    versions instead of racing to delete entries: the catalog version (all
+    list pages) and the written project's own version on every write.
+    A reader captures the version *before* querying the database, so a
+    result computed concurrently with an admin edit is stored under the old
+    version and never served afterwards. The TTL bounds staleness across
+    processes, which do not see each other's write listeners.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._counter = count(1)
+        self.catalog_version = next(self._counter)
+        self._project_versions: Dict[int, int] = {}
+        # Wall-clock time of the last write, used for Last-Modified headers.
+        # Until seed_modified_at() reads the database we only know the data
+        # is no newer than our start.
+        self._baseline_modified_at = time.time()
+        self.catalog_modified_at = self._baseline_modified_at
+        self._project_modified_at: Dict[int, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # --------------------------------------------------
+    # VERSIONS
+    # --------------------------------------------------
+    def list_version(self) -> int:
+        return self.catalog_version
+
+    def project_version(self, project_id: int) -> int:
+        return self._project_versions.get(project_id, 0)
+
+    def project_modified_at(self, project_id: int) -> float:
+        return self._project_modified_at.get(project_id, self._baseline_modified_at)
+
+    def seed_modified_at(self, modified_at: Optional[datetime]) -> None:
+        """
+        Use the newest row timestamp in the database as the baseline, so
+        every process and restart sends the same Last-Modified for data
+        that hasn't changed. Writes seen by this process still win.
+        """
+        if modified_at is None:
+            return
+        if modified_at.tzinfo is None:
+            modified_at = modified_at.replace(tzinfo=timezone.utc)
+        seeded = min(modified_at.timestamp(), time.time())
+        with self._lock:
+            if self.catalog_modified_at == self._baseline_modified_at:
+                self.catalog_modified_at = seeded
+            self._baseline_modified_at = seeded
+
+    def on_project_write(self, action: str, project_id: int, project=None) -> None:
+        """crud/project.py write listener"""
+        now = time.time()
+        with self._lock:
+            self.catalog_version = next(self._counter)
+            self.catalog_modified_at = now
+            self._project_versions[project_id] = next(self._counter)
+            self._project_modified_at[project_id] = now
+            self._entries.pop(("project", project_id), None)
+
+    # --------------------------------------------------
+    # ENTRIES
+    # --------------------------------------------------
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, expires_at, value = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, version: int, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.catalog_version = next(self._counter)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "catalog_version": self.catalog_version,
+            }
+
+
+# One cache per process, wired to crud write listeners in main.py
+project_cache = ProjectCache(
+    max_entries=PROJECT_CACHE_MAX_ENTRIES, ttl_seconds=PROJECT_CACHE_TTL_SECONDS
+)
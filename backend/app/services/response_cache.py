@@ -0,0 +1,81 @@
+"""
+Response Cache
+Bounded TTL + LRU cache for repeat chatbot answers
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Case, punctuation and whitespace insensitive form of a message"""
+    text = _PUNCT_RE.sub("", text.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def make_cache_key(
+    message: str, history: List[Dict[str, str]], system_prompt: str
+) -> str:
+    """Normalized question + (short) history + hash of the prompt context"""
+    parts = [
+        f"{m.get('role')}:{normalize_question(m.get('content', ''))}" for m in history
+    ]
+    parts.append(f"user:{normalize_question(message)}")
+    context = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    return hashlib.sha256("\x1f".join(parts + [context]).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,217 @@
+"""
+Retrieval Index
+In-process BM25 index over the resume, summary and project write-ups
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i in is it "
+    "its me my of on or so that the their there this to was we what when where "
+    "which who why will with you your".split()
+)
+
+# Project columns worth retrieving, in the order they are rendered
+PROJECT_FIELDS = (
+    ("short_description", "Summary"),
+    ("tech_stack", "Tech stack"),
+    ("problem_statement", "Problem"),
+    ("why_built", "Why built"),
+    ("architecture", "Architecture"),
+    ("implementation_details", "Implementation"),
+    ("challenges", "Challenges"),
+    ("learnings", "Learnings"),
+    ("future_improvements", "Future improvements"),
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_text(text: str, chunk_size: int = 700) -> List[str]:
+    """Pack lines into ~chunk_size character chunks, hard-wrapping long lines"""
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+
+    lines: List[str] = []
+    for line in text.splitlines():
+        line = line.strip()
+        while len(line) > chunk_size:
+            cut = line.rfind(" ", 0, chunk_size)
+            cut = cut if cut > 0 else chunk_size
+            lines.append(line[:cut])
+            line = line[cut:].strip()
+        if line:
+            lines.append(line)
+
+    for line in lines:
+        if current and length + len(line) + 1 > chunk_size:
+            chunks.append("\n".join(current))
+            current, length = [], 0
+        current.append(line)
+        length += len(line) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+@dataclass
+class Chunk:
+    chunk_id: str
+    source: str
+    text: str
+    terms: Counter = field(repr=False, default_factory=Counter)
+    length: int = 0
+
+
+class RetrievalIndex:
+    """
+    BM25 over text chunks grouped by source ("resume", "summary",
+    "project:<id>"). Replacing or removing a source only touches that
+    source's chunks and postings, so project edits are cheap to apply.
+    """
+
+    def __init__(self, chunk_size: int = 700, k1: float = 1.5, b: float = 0.75):
+        self.chunk_size = chunk_size
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._chunks: Dict[str, Chunk] = {}
+        self._by_source: Dict[str, List[str]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    # --------------------------------------------------
+    # WRITES
+    # --------------------------------------------------
+    def replace_source(self, source: str, text: str, header: str = ""):
+        """Re-chunk one source. `header` is prefixed to every chunk (e.g. a title)"""
+        with self._lock:
+            self._remove_locked(source)
+            ids = []
+            for n, body in enumerate(chunk_text(text, self.chunk_size)):
+                content = f"{header}\n{body}" if header else body
+                terms = Counter(tokenize(content))
+                chunk = Chunk(
+                    chunk_id=f"{source}#{n}",
+                    source=source,
+                    text=content,
+                    terms=terms,
+                    length=sum(terms.values()),
+                )
+                self._chunks[chunk.chunk_id] = chunk
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[chunk.chunk_id] = tf
+                self._total_length += chunk.length
+                ids.append(chunk.chunk_id)
+            if ids:
+                self._by_source[source] = ids
+            self.version += 1
+
+    def remove_source(self, source: str):
+        with self._lock:
+            self._remove_locked(source)
+            self.version += 1
+
+    def _remove_locked(self, source: str):
+        for chunk_id in self._by_source.pop(source, []):
+            chunk = self._chunks.pop(chunk_id)
+            for term in chunk.terms:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= chunk.length
+
+    def upsert_project(self, project) -> None:
+        """Index a Project row (or any object with the same attributes)"""
+        parts = []
+        for attr, label in PROJECT_FIELDS:
+            value = getattr(project, attr, None)
+            if value:
+                parts.append(f"{label}: {value}")
+        for attr, label in (("github_url", "GitHub"), ("live_url", "Live")):
+            value = getattr(project, attr, None)
+            if value:
+                parts.append(f"{label}: {value}")
+        self.replace_source(
+            f"project:{project.id}",
+            "\n".join(parts),
+            header=f"Project: {project.title}",
+        )
+
+    def remove_project(self, project_id: int) -> None:
+        self.remove_source(f"project:{project_id}")
+
+    # --------------------------------------------------
+    # READS
+    # --------------------------------------------------
+    def search(self, query: str, k: int = 6) -> List[Chunk]:
+        """Top-k chunks by BM25; pads with summary/resume chunks when few match"""
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._chunks)
+            if n_docs == 0:
+                return []
+            avg_len = self._total_length / n_docs or 1.0
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for chunk_id, tf in postings.items():
+                    length = self._chunks[chunk_id].length
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_len)
+                    scores[chunk_id] = (
+                        scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                    )
+
+            ranked = sorted(scores, key=lambda cid: (-scores[cid], cid))[:k]
+            results = [self._chunks[cid] for cid in ranked]
+
+            # Greetings and vague questions still need some grounding
+            if len(results) < k:
+                seen = set(ranked)
+                for source in ("summary", "resume"):
+                    for chunk_id in self._by_source.get(source, []):
+                        if len(results) >= k:
+                            break
+                        if chunk_id not in seen:
+                            results.append(self._chunks[chunk_id])
+                            seen.add(chunk_id)
+            return results
+
+    def sources(self) -> Dict[str, int]:
+        with self._lock:
+            return {source: len(ids) for source, ids in self._by_source.items()}
+
+
+def format_chunks(chunks: List[Chunk]) -> str:
+    return "\n\n".join(f"[{chunk.source}]\n{chunk.text}" for chunk in chunks)
+
+
+def build_query(message: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+    """The new message plus the previous user turn, so follow-ups stay on topic"""
+    for msg in reversed(history or []):
+        if msg.get("role") == "user":
+            return f"{message}\n{msg.get('content', '')}"
+    return message
@@ -0,0 +1,240 @@
+"""
+Catalog Snapshot
+Renders the public project catalog to versioned, precompressed static files
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional, Tuple
+
+import brotli
+from crud.project import aiter_projects
+from crud.tag import aget_tag_counts
+from db.session import AsyncSessionLocal
+from pydantic import TypeAdapter
+from schemas.project import ProjectResponse, ProjectSummary, TagCount
+
+_summary_list = TypeAdapter(list[ProjectSummary])
+_tag_list = TypeAdapter(list[TagCount])
+
+MANIFEST_NAME = "manifest.json"
+VERSIONS_DIR = "v"
+
+
+def _render_files(projects: List, tag_counts: List) -> Dict[str, bytes]:
+    """Relative path -> JSON body, matching the API's response shapes"""
+    newest_first = sorted(projects, key=lambda p: (p.created_at, p.id), reverse=True)
+    summaries = _summary_list.validate_python(newest_first, from_attributes=True)
+    tags = _tag_list.validate_python(tag_counts, from_attributes=True)
+
+    files = {
+        "index.json": _summary_list.dump_json(summaries),
+        "tags.json": _tag_list.dump_json(tags),
+    }
+    for project in projects:
+        files[f"projects/{project.id}.json"] = (
+            ProjectResponse.model_validate(project).model_dump_json().encode()
+        )
+    return files
+
+
+def _content_version(files: Dict[str, bytes]) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(path.encode())
+        digest.update(b"\0")
+        digest.update(files[path])
+    return digest.hexdigest()[:16]
+
+
+def _write_atomic(path: str, body: bytes):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def read_manifest(out_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def render_snapshot(
+    projects: List, tag_counts: List, out_dir: str, keep: int = 3
+) -> Tuple[Dict, bool]:
+    """
+    Write v/<version>/ (each file plus .gz and .br siblings), then swap
+    manifest.json to point at it. Versions are content hashes, so files
+    under v/ never change once written and can be cached forever; only the
+    manifest needs a short cache lifetime. Returns (manifest, changed).
+    """
+    files = _render_files(projects, tag_counts)
+    version = _content_version(files)
+
+    current = read_manifest(out_dir)
+    if current and current.get("version") == version:
+        return current, False
+
+    entries = {
+        path: {"bytes": len(body), "sha256": hashlib.sha256(body).hexdigest()}
+        for path, body in files.items()
+    }
+
+    versions_root = os.path.join(out_dir, VERSIONS_DIR)
+    final_dir = os.path.join(versions_root, version)
+    if not os.path.isdir(final_dir):
+        staging = f"{final_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        previous = _previous_files(out_dir, current)
+        for path, body in files.items():
+            target = os.path.join(staging, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Compression dominates build time; reuse files that didn't change
+            source = previous.get((path, entries[path]["sha256"]))
+            if source and _link_all(source, target):
+                continue
+            with open(target, "wb") as f:
+                f.write(body)
+            with open(f"{target}.gz", "wb") as f:
+                f.write(gzip.compress(body, compresslevel=9, mtime=0))
+            with open(f"{target}.br", "wb") as f:
+                f.write(brotli.compress(body, quality=11))
+        os.replace(staging, final_dir)
+
+    manifest = {
+        "version": version,
+        "path": f"{VERSIONS_DIR}/{version}",
+        "generated_at": int(time.time()),
+        "projects": len(projects),
+        "encodings": ["gzip", "br"],
+        "files": entries,
+    }
+    _write_atomic(
+        os.path.join(out_dir, MANIFEST_NAME),
+        json.dumps(manifest, indent=2).encode("utf-8"),
+    )
+    _prune(versions_root, keep=keep, current=version)
+    return manifest, True
+
+
+def _previous_files(out_dir: str, manifest: Optional[Dict]) -> Dict[Tuple, str]:
+    """(path, sha256) -> file in the current version, for reuse"""
+    if not manifest:
+        return {}
+    base = os.path.join(out_dir, manifest.get("path", ""))
+    return {
+        (path, entry["sha256"]): os.path.join(base, path)
+        for path, entry in manifest.get("files", {}).items()
+    }
+
+
+def _link_all(source: str, target: str) -> bool:
+    """Hard-link a file and its compressed siblings; False if any is missing"""
+    try:
+        for suffix in ("", ".gz", ".br"):
+            try:
+                os.link(source + suffix, target + suffix)
+            except OSError:
+                shutil.copy2(source + suffix, target + suffix)
+        return True
+    except OSError:
+        for suffix in ("", ".gz", ".br"):
+            if os.path.exists(target + suffix):
+                os.remove(target + suffix)
+        return False
+
+
+def _prune(versions_root: str, keep: int, current: str):
+    """Drop all but the newest `keep` versions (clients may still hold old ones)"""
+    names = [
+        name
+        for name in os.listdir(versions_root)
+        if os.path.isdir(os.path.join(versions_root, name)) and ".tmp-" not in name
+    ]
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(versions_root, n)))
+    stale = [n for n in names if n != current][: max(0, len(names) - max(keep, 1))]
+    for name in stale:
+        shutil.rmtree(os.path.join(versions_root, name), ignore_errors=True)
+
+
+async def abuild_snapshot(out_dir: str, keep: int = 3) -> Tuple[Dict, bool]:
+    """Load the catalog, then render it off the event loop"""
+    os.makedirs(out_dir, exist_ok=True)
+    projects: List = []
+    async with AsyncSessionLocal() as db:
+        async for page in aiter_projects(db):
+            projects.extend(page)
+        tag_counts = await aget_tag_counts(db)
+    return await asyncio.to_thread(render_snapshot, projects, tag_counts, out_dir, keep)
+
+
+class SnapshotScheduler:
+    """
+    crud/project.py write listener that rebuilds the snapshot after admin
+    writes. Rebuilds are debounced (a bulk import triggers one build, not
+    thousands) and never overlap; a write during a build queues one more.
+    """
+
+    def __init__(self, out_dir: str, keep: int = 3, debounce: float = 2.0):
+        self.out_dir = out_dir
+        self.keep = keep
+        self.debounce = debounce
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self.stats = {"builds": 0, "skipped": 0, "failed": 0, "version": None}
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self.schedule()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_project_write(self, action: str, project_id: int, project=None) -> None:
+        self.schedule()
+
+    def schedule(self):
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._mark_dirty()
+        else:
+            self._loop.call_soon_threadsafe(self._mark_dirty)
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._dirty:
+            await asyncio.sleep(self.debounce)
+            self._dirty = False
+            try:
+                manifest, changed = await abuild_snapshot(self.out_dir, self.keep)
+                self.stats["builds" if changed else "skipped"] += 1
+                self.stats["version"] = manifest["version"]
+                if changed:
+                    print(f"Catalog snapshot {manifest['version']} written")
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"Catalog snapshot error: {e}")
@@ -0,0 +1,170 @@
+"""
+Chatbot Tools
+Registry of the functions the model may call, run concurrently with timeouts
+
+Handlers are plain sync callables (they may block, e.g. an inline Pushover
+POST), so each call runs on a worker thread. The calls in one assistant turn
+are independent and run together; a call that exceeds its timeout is
+reported back to the model as an error while the turn carries on.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from core.metrics import Counter, Histogram
+
+TOOL_CALLS = Counter(
+    "chatbot_tool_calls_total",
+    "Tool calls requested by the model.",
+    ("tool",),
+)
+TOOL_LATENCY = Histogram(
+    "chatbot_tool_duration_seconds",
+    "Tool execution time by outcome (ok, error, timeout, unknown).",
+    ("tool", "outcome"),
+)
+
+
+@dataclass
+class Tool:
+    name: str
+    description: str
+    parameters: Dict[str, Any]
+    handler: Callable[..., Dict[str, Any]]
+    timeout: Optional[float] = None
+
+    def schema(self) -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters,
+            },
+        }
+
+
+class ToolRegistry:
+    def __init__(self, default_timeout: float = 5.0, max_workers: int = 4):
+        self.default_timeout = default_timeout
+        self.max_workers = max_workers
+        self._tools: Dict[str, Tool] = {}
+        # Only used by the blocking run(); the async path uses asyncio.to_thread
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def register(self, tool: Tool) -> Tool:
+        self._tools[tool.name] = tool
+        return tool
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        return [tool.schema() for tool in self._tools.values()]
+
+    def _timeout(self, tool: Tool, deadline: Optional[float]) -> float:
+        timeout = tool.timeout if tool.timeout is not None else self.default_timeout
+        if deadline is not None:
+            timeout = min(timeout, max(deadline - time.monotonic(), 0.0))
+        return timeout
+
+    def _prepare(self, tool_call):
+        """(tool, kwargs, error result) for one call; error set if it can't run"""
+        name = tool_call.function.name
+        TOOL_CALLS.inc((name,))
+        tool = self._tools.get(name)
+        if tool is None:
+            TOOL_LATENCY.observe(0.0, (name, "unknown"))
+            return None, None, {"error": "Unknown tool"}
+        try:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+            if not isinstance(arguments, dict):
+                raise ValueError("arguments must be an object")
+        except ValueError as e:
+            TOOL_LATENCY.observe(0.0, (name, "error"))
+            return tool, None, {"error": f"Invalid arguments: {e}"}
+        return tool, arguments, None
+
+    @staticmethod
+    def _message(tool_call, result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "role": "tool",
+            "content": json.dumps(result),
+            "tool_call_id": tool_call.id,
+        }
+
+    def _record(self, tool: Tool, started: float, outcome: str):
+        TOOL_LATENCY.observe(time.perf_counter() - started, (tool.name, outcome))
+
+    async def _arun_one(self, tool_call, deadline: Optional[float]) -> Dict[str, Any]:
+        tool, arguments, error = self._prepare(tool_call)
+        if error is not None:
+            return self._message(tool_call, error)
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                asyncio.to_thread(tool.handler, **arguments),
+                self._timeout(tool, deadline),
+            )
+            self._record(tool, started, "ok")
+        except asyncio.TimeoutError:
+            self._record(tool, started, "timeout")
+            result = {"error": "Tool timed out"}
+        except Exception as e:
+            self._record(tool, started, "error")
+            result = {"error": str(e)}
+        return self._message(tool_call, result)
+
+    async def arun(
+        self, tool_calls, deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Run one turn's tool calls concurrently; results keep the call order"""
+        return list(
+            await asyncio.gather(*(self._arun_one(c, deadline) for c in tool_calls))
+        )
+
+    def run(self, tool_calls, deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Blocking twin of arun() for ChatbotService.chat"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="chatbot-tool"
+            )
+
+        results: List[Optional[Dict[str, Any]]] = []
+        running = []
+        for position, tool_call in enumerate(tool_calls):
+            tool, arguments, error = self._prepare(tool_call)
+            if error is not None:
+                results.append(self._message(tool_call, error))
+                continue
+            results.append(None)
+            future = self._executor.submit(tool.handler, **arguments)
+            started = time.perf_counter()
+            limit = started + self._timeout(tool, deadline)
+            running.append((position, tool_call, tool, future, started, limit))
+
+        # Each call's timeout counts from its own submission, not from when
+        # the calls before it finished
+        for position, tool_call, tool, future, started, limit in running:
+            try:
+                result = future.result(timeout=max(limit - time.perf_counter(), 0))
+                self._record(tool, started, "ok")
+            except FutureTimeout:
+                self._record(tool, started, "timeout")
+                result = {"error": "Tool timed out"}
+            except Exception as e:
+                self._record(tool, started, "error")
+                result = {"error": str(e)}
+            results[position] = self._message(tool_call, result)
+        return results  # type: ignore
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -1,13 +1,23 @@
-from app.db.base import Base
-from app.db.session import engine
+from crud.search import ensure_search_index
+from crud.tag import backfill_tags, tags_need_backfill
+from db.base import Base
+from db.session import SessionLocal, engine
 
 
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+    # First boot after the tags tables were added: derive them once
+    with SessionLocal() as db:
+        if tags_need_backfill(db):
+            print(f"Backfilled tags for {backfill_tags(db)} projects")
 
 
 if __name__ == "__main__":
+    # Run as `python app/startup.py` from backend/ before deploying an image
+    # that starts with DB_INIT_ON_STARTUP=false
     print("Initializing database...")
     init_db()
     print("Database initialized successfully!")
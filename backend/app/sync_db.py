@@ -1,3 +1,4 @@
+from app.crud.search import ensure_search_index
 from app.db.base import Base
 from app.db.session import engine
 
@@ -9,6 +10,8 @@ def reset_db():
     # WARNING: This deletes all data in the projects table!
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_search_index(conn)
     print("✅ Sync complete! Your Neon table now matches your Python model.")
 
 
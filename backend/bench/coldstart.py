@@ -0,0 +1,188 @@
+"""
+Cold-start timing report
+
+Boots a fresh app process several times per startup variant and measures:
+
+- import_ms   `import main` in a new interpreter
+- ready_ms    process spawn until /health answers
+- first_*_ms  the first request to each endpoint after ready, then the same
+              request again (warm_*_ms) for comparison
+
+Variants:
+  full  DB_INIT_ON_STARTUP=true and no context artifact (resume PDF parsed)
+  fast  DB_INIT_ON_STARTUP=false and the prebuilt artifact (the Docker image)
+
+Run from backend/:
+  python bench/coldstart.py --out bench/coldstart.json
+  python bench/coldstart.py --compare bench/coldstart.json
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import bcrypt
+import httpx
+from harness import (
+    ADMIN_PASSWORD,
+    APP_DIR,
+    BENCH_DIR,
+    app_env,
+    base_env,
+    free_port,
+    seed_projects,
+    start_server,
+    stop,
+    wait_ready,
+)
+from report import compare, write_results
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _boot_once(env: dict, workdir: str, project_id: int) -> Dict[str, float]:
+    sample: Dict[str, float] = {}
+
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    sample["import_ms"] = float(out.stdout.strip().splitlines()[-1])
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    app = start_server("main:app", port, APP_DIR, env, f"{workdir}/app.log")
+    try:
+        wait_ready(f"{url}/health", app, interval=0.01)
+        sample["ready_ms"] = (time.perf_counter() - started) * 1000
+
+        requests = {
+            "projects_list": lambda c: c.get("/projects/").raise_for_status(),
+            "project_detail": lambda c: c.get(
+                f"/projects/{project_id}"
+            ).raise_for_status(),
+            "chat": lambda c: c.post(
+                "/api/v1/chatbot/chat",
+                json={"message": f"Cold start question {time.time()}", "history": []},
+            ).raise_for_status(),
+        }
+        with httpx.Client(base_url=url, timeout=60) as client:
+            for name, request in requests.items():
+                sample[f"first_{name}_ms"] = _timed(lambda: request(client))
+                sample[f"warm_{name}_ms"] = _timed(lambda: request(client))
+    finally:
+        stop(app)
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="boots per variant")
+    parser.add_argument("--variants", default="full,fast")
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "coldstart.json"))
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="portfolio-coldstart-")
+    artifact = os.path.join(workdir, "context.json")
+    subprocess.run(
+        [sys.executable, os.path.join(APP_DIR, "build_context.py"), "--out", artifact],
+        check=True,
+        capture_output=True,
+    )
+    variants = {
+        "full": {
+            "DB_INIT_ON_STARTUP": "true",
+            "CHAT_CONTEXT_ARTIFACT": os.path.join(workdir, "missing.json"),
+        },
+        "fast": {"DB_INIT_ON_STARTUP": "false", "CHAT_CONTEXT_ARTIFACT": artifact},
+    }
+
+    fake_port = free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    fake = start_server(
+        "fakes:app",
+        fake_port,
+        BENCH_DIR,
+        {**base_env(), "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms)},
+        f"{workdir}/fakes.log",
+    )
+    password_hash = bcrypt.hashpw(
+        ADMIN_PASSWORD.encode(), bcrypt.gensalt(rounds=4)
+    ).decode()
+
+    results: List[dict] = []
+    try:
+        wait_ready(f"{fake_url}/_stats", fake)
+
+        # One full boot creates the schema and seeds the catalog for every run
+        setup_port = free_port()
+        setup = start_server(
+            "main:app",
+            setup_port,
+            APP_DIR,
+            app_env(workdir, fake_url, password_hash, variants["full"]),
+            f"{workdir}/app.log",
+        )
+        try:
+            wait_ready(f"http://127.0.0.1:{setup_port}/health", setup)
+            project_id = seed_projects(f"http://127.0.0.1:{setup_port}", args.projects)[
+                0
+            ]
+        finally:
+            stop(setup)
+
+        for variant in [v for v in args.variants.split(",") if v]:
+            env = app_env(workdir, fake_url, password_hash, variants[variant])
+            samples = [_boot_once(env, workdir, project_id) for _ in range(args.runs)]
+            for metric in samples[0]:
+                values = [s[metric] for s in samples]
+                row = {
+                    "variant": variant,
+                    "metric": metric,
+                    "median_ms": round(statistics.median(values), 2),
+                    "min_ms": round(min(values), 2),
+                    "max_ms": round(max(values), 2),
+                }
+                results.append(row)
+                print(
+                    f"{variant:5s} {metric:26s} median {row['median_ms']:>9.2f} ms  "
+                    f"min {row['min_ms']:>9.2f}  max {row['max_ms']:>9.2f}"
+                )
+    finally:
+        stop(fake)
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("out", "compare")}
+    if args.compare:
+        if not compare(
+            args.compare, results, ("variant", "metric"), "median_ms", args.threshold
+        ):
+            sys.exit(1)
+    else:
+        write_results(args.out, "coldstart", settings, results)
+
+
+if __name__ == "__main__":
+    main()
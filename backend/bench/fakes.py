@@ -0,0 +1,162 @@
+"""
+Local stand-ins for the chatbot's upstreams
+
+- POST /v1beta/openai/chat/completions  OpenAI-compatible (Gemini) fake
+- POST /1/messages.json                 Pushover sink
+- GET  /_stats                          request counters
+
+Behaviour comes from environment variables so run_load.py can start it as
+a plain uvicorn subprocess:
+
+  FAKE_LLM_LATENCY_MS   delay before the first byte (default 300)
+  FAKE_LLM_CHUNK_MS     delay between streamed chunks (default 15)
+  FAKE_LLM_TOOL_EVERY   every Nth user turn asks for a tool call first (0 = never)
+  FAKE_LLM_REPLY        reply text (default: a ~60 word paragraph)
+  FAKE_PUSHOVER_MS      Pushover sink latency (default 50)
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from itertools import count
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+LATENCY = float(os.getenv("FAKE_LLM_LATENCY_MS", "300")) / 1000
+CHUNK_DELAY = float(os.getenv("FAKE_LLM_CHUNK_MS", "15")) / 1000
+TOOL_EVERY = int(os.getenv("FAKE_LLM_TOOL_EVERY", "0"))
+PUSHOVER_LATENCY = float(os.getenv("FAKE_PUSHOVER_MS", "50")) / 1000
+REPLY = os.getenv(
+    "FAKE_LLM_REPLY",
+    "Sohail is a data platform engineer who builds reliable pipelines and "
+    "APIs. He has shipped FastAPI services backed by Postgres, streaming "
+    "ingestion on cloud platforms, and this portfolio's own chatbot. Ask about "
+    "a specific project for architecture details, trade-offs and what he "
+    "learned along the way.",
+)
+
+_turns = count(1)
+stats = {"completions": 0, "streams": 0, "tool_calls": 0, "pushover": 0}
+
+
+def _usage(messages) -> dict:
+    prompt = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    completion = len(REPLY) // 4
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": prompt + completion,
+    }
+
+
+def _wants_tool(messages) -> bool:
+    """Tool round on every Nth fresh user turn; never right after a tool result"""
+    if not TOOL_EVERY or (messages and messages[-1].get("role") == "tool"):
+        return False
+    return next(_turns) % TOOL_EVERY == 0
+
+
+def _tool_call(messages) -> dict:
+    question = str(messages[-1].get("content") or "")[:200]
+    return {
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {
+            "name": "record_unknown_question",
+            "arguments": json.dumps({"question": question}),
+        },
+    }
+
+
+async def completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    model = body.get("model", "fake")
+    tool = _tool_call(messages) if _wants_tool(messages) else None
+    if tool:
+        stats["tool_calls"] += 1
+
+    await asyncio.sleep(LATENCY)
+
+    if body.get("stream"):
+        stats["streams"] += 1
+        return StreamingResponse(
+            _stream(model, messages, tool), media_type="text/event-stream"
+        )
+
+    stats["completions"] += 1
+    message = {"role": "assistant", "content": None if tool else REPLY}
+    if tool:
+        message["tool_calls"] = [tool]
+    return JSONResponse(
+        {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if tool else "stop",
+                }
+            ],
+            "usage": _usage(messages),
+        }
+    )
+
+
+async def _stream(model, messages, tool):
+    base = {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+    }
+
+    def event(delta, finish_reason=None, usage=None) -> str:
+        chunk = {
+            **base,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            if delta is not None
+            else [],
+        }
+        if usage is not None:
+            chunk["usage"] = usage
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    if tool:
+        yield event({"role": "assistant", "tool_calls": [{"index": 0, **tool}]})
+        yield event({}, "tool_calls")
+    else:
+        for word in REPLY.split(" "):
+            yield event({"content": word + " "})
+            await asyncio.sleep(CHUNK_DELAY)
+        yield event({}, "stop")
+    yield event(None, usage=_usage(messages))
+    yield "data: [DONE]\n\n"
+
+
+async def pushover(request: Request):
+    await request.form()
+    stats["pushover"] += 1
+    await asyncio.sleep(PUSHOVER_LATENCY)
+    return JSONResponse({"status": 1, "request": str(uuid.uuid4())})
+
+
+async def get_stats(request: Request):
+    return JSONResponse(stats)
+
+
+app = Starlette(
+    routes=[
+        Route("/v1beta/openai/chat/completions", completions, methods=["POST"]),
+        Route("/1/messages.json", pushover, methods=["POST"]),
+        Route("/_stats", get_stats),
+    ]
+)
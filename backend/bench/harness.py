@@ -0,0 +1,153 @@
+"""Starting the app and the fake upstreams as subprocesses for the benchmarks"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(BENCH_DIR), "app")
+
+ADMIN_USERNAME = "bench"
+ADMIN_PASSWORD = "bench-password"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(module: str, port: int, cwd: str, env: dict, log_path: str):
+    log = open(log_path, "ab")
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            module,
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=cwd,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def wait_ready(
+    url: str, proc: subprocess.Popen, timeout: float = 60, interval: float = 0.2
+):
+    # Poll with a bare connect first: building an httpx client per attempt
+    # costs enough CPU to slow down the server we're waiting for
+    address = httpx.URL(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {proc.returncode}")
+        try:
+            socket.create_connection((address.host, address.port), timeout=1).close()
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except (OSError, httpx.HTTPError):
+            pass
+        time.sleep(interval)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def stop(*procs: subprocess.Popen):
+    for proc in procs:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def base_env() -> Dict[str, str]:
+    """The caller's environment minus settings that would change what we measure"""
+    return {k: v for k, v in os.environ.items() if not k.startswith("SNAPSHOT_")}
+
+
+def app_env(
+    workdir: str,
+    fake_url: str,
+    password_hash: str,
+    extra: Optional[Dict[str, str]] = None,
+) -> Dict[str, str]:
+    return {
+        **base_env(),
+        "PYTHONPATH": APP_DIR,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        # Each run starts from an empty database
+        "DB_INIT_ON_STARTUP": "true",
+        "ADMIN_USERNAME": ADMIN_USERNAME,
+        "ADMIN_PASSWORD_HASH": password_hash,
+        "SECRET_KEY": "bench-secret",
+        "GEMINI_API_KEY": "bench-key",
+        "GEMINI_BASE_URL": f"{fake_url}/v1beta/openai/",
+        "PUSHOVER_USER": "bench-user",
+        "PUSHOVER_TOKEN": "bench-token",
+        "PUSHOVER_API_URL": f"{fake_url}/1/messages.json",
+        "NOTIFY_SPILL_PATH": os.path.join(workdir, "spill.ndjson"),
+        # Measure the bcrypt path itself, not the login throttle
+        "LOGIN_IP_RATE_PER_MINUTE": "0",
+        "LOGIN_USER_RATE_PER_MINUTE": "0",
+        # All load comes from one IP; the chat concurrency cap stays on
+        "CHAT_IP_RATE_PER_MINUTE": "0",
+        "CONTACT_IP_RATE_PER_MINUTE": "0",
+        **(extra or {}),
+    }
+
+
+def _seed_lines(count: int) -> str:
+    stacks = [
+        "Python, FastAPI",
+        "Go, Postgres",
+        "TypeScript, Next.js",
+        "Spark, Airflow",
+    ]
+    body = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40
+    lines = []
+    for i in range(count):
+        lines.append(
+            json.dumps(
+                {
+                    "title": f"Benchmark project {i}",
+                    "short_description": f"Seeded project number {i} for load tests",
+                    "tech_stack": stacks[i % len(stacks)],
+                    "problem_statement": body,
+                    "architecture": body,
+                    "implementation_details": body,
+                    "learnings": body,
+                }
+            )
+        )
+    return "\n".join(lines)
+
+
+def seed_projects(app_url: str, count: int) -> List[int]:
+    """Log in, import `count` projects via NDJSON, return up to 100 ids"""
+    token = httpx.post(
+        f"{app_url}/auth/login",
+        data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+    ).json()["access_token"]
+    httpx.post(
+        f"{app_url}/projects/import",
+        content=_seed_lines(count),
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=120,
+    ).raise_for_status()
+    projects = httpx.get(f"{app_url}/projects/", params={"limit": 100}).json()
+    return [p["id"] for p in projects]
@@ -0,0 +1,135 @@
+"""
+Micro-benchmarks for hot in-process paths
+
+- system prompt / message assembly (retrieval + prompt string building)
+- resume PDF extraction and full context refresh
+- project list serialization: stock encoder vs pydantic vs orjson response
+
+Run from backend/:
+  python bench/micro.py --out bench/micro.json
+  python bench/micro.py --compare bench/micro.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(BENCH_DIR), "app")
+sys.path.insert(0, APP_DIR)
+
+# core.config requires these; nothing here talks to the network or a database
+for _name, _value in {
+    "DATABASE_URL": "sqlite://",
+    "ADMIN_USERNAME": "bench",
+    "ADMIN_PASSWORD_HASH": "unused",
+    "SECRET_KEY": "bench-secret",
+    "GEMINI_API_KEY": "bench-key",
+    "PUSHOVER_USER": "bench-user",
+    "PUSHOVER_TOKEN": "bench-token",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import io  # noqa: E402
+
+from core.responses import FastJSONResponse  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from pypdf import PdfReader  # noqa: E402
+from report import compare, write_results  # noqa: E402
+from schemas.project import ProjectSummary  # noqa: E402
+from services.chatbot_service import ChatbotService  # noqa: E402
+from services.retrieval import format_chunks  # noqa: E402
+
+
+def _time(fn: Callable, repeat: int) -> Dict[str, float]:
+    """Best and median per-call time over `repeat` autoranged runs"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+    return {
+        "loops": number,
+        "best_us": round(runs[0] * 1e6, 3),
+        "median_us": round(runs[len(runs) // 2] * 1e6, 3),
+    }
+
+
+def _summaries(count: int) -> List[ProjectSummary]:
+    now = datetime.now(timezone.utc)
+    return [
+        ProjectSummary(
+            id=i,
+            title=f"Benchmark project {i}",
+            short_description=f"Seeded project number {i} for serialization",
+            tech_stack="Python, FastAPI, Postgres",
+            created_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def cases(list_size: int) -> Dict[str, Callable]:
+    service = ChatbotService(gemini_api_key="bench-key")
+    with open(service.resume_path, "rb") as f:
+        resume_bytes = f.read()
+    history = [
+        {"role": "user", "content": "What do you work on day to day?"},
+        {"role": "assistant", "content": "Mostly data platform work. " * 20},
+    ] * 3
+    context = format_chunks(service.index.search("data pipelines", k=4))
+
+    summaries = _summaries(list_size)
+    adapter = TypeAdapter(list[ProjectSummary])
+
+    def pdf_extract():
+        reader = PdfReader(io.BytesIO(resume_bytes))
+        return "".join(p.extract_text() or "" for p in reader.pages)
+
+    return {
+        "system_prompt": lambda: service._build_system_prompt(service.name, context),
+        "build_messages": lambda: service._build_messages(
+            "Tell me about your streaming pipelines", history
+        ),
+        "pdf_extract": pdf_extract,
+        "refresh_context": lambda: service.refresh_context(force=True),
+        "serialize_stdlib": lambda: json.dumps(jsonable_encoder(summaries)).encode(),
+        "serialize_pydantic": lambda: adapter.dump_json(summaries),
+        "serialize_response": lambda: FastJSONResponse(jsonable_encoder(summaries)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", default="", help="comma-separated case names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--list-size", type=int, default=100)
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "micro.json"))
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    selected = {name for name in args.only.split(",") if name}
+    results = []
+    for name, fn in cases(args.list_size).items():
+        if selected and name not in selected:
+            continue
+        row = {"case": name, **_time(fn, args.repeat)}
+        results.append(row)
+        print(
+            f"{name:20s} best {row['best_us']:>12.2f} us  median {row['median_us']:>12.2f} us"
+        )
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("out", "compare")}
+    if args.compare:
+        if not compare(args.compare, results, ("case",), "median_us", args.threshold):
+            sys.exit(1)
+    else:
+        write_results(args.out, "micro", settings, results)
+
+
+if __name__ == "__main__":
+    main()
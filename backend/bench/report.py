@@ -0,0 +1,97 @@
+"""Percentiles, result files and baseline comparison shared by the benchmarks"""
+
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Dict, List, Sequence, Tuple
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_ms(samples: List[float]) -> Dict[str, float]:
+    """Latency samples in seconds -> p50/p95/p99/mean/max in milliseconds"""
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered) if ordered else 0.0
+    return {
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(mean * 1000, 3),
+        "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 3),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            timeout=5,
+        )
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def write_results(path: str, kind: str, settings: dict, results: List[dict]):
+    payload = {
+        "kind": kind,
+        "meta": {
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "timestamp": int(time.time()),
+            "settings": settings,
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def compare(
+    baseline_path: str,
+    results: List[dict],
+    key_fields: Tuple[str, ...],
+    metric: str,
+    threshold: float,
+) -> bool:
+    """
+    Print current vs baseline for `metric` (lower is better). Returns False
+    if any entry regressed by more than `threshold` (0.2 = 20%).
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {tuple(r[k] for k in key_fields): r for r in baseline["results"]}
+
+    ok = True
+    print(f"\nvs {baseline_path} (git {baseline['meta'].get('git')}), {metric}:")
+    for row in results:
+        key = tuple(row[k] for k in key_fields)
+        old = previous.get(key)
+        label = " ".join(str(k) for k in key)
+        if old is None or not old.get(metric):
+            print(f"  {label:40s} {row[metric]:>10.3f}   (no baseline)")
+            continue
+        change = (row[metric] - old[metric]) / old[metric]
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(
+            f"  {label:40s} {old[metric]:>10.3f} -> {row[metric]:>10.3f} "
+            f"({change:+.1%}){flag}"
+        )
+    return ok
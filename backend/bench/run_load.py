@@ -0,0 +1,202 @@
+"""
+HTTP load test
+
+Starts the fake upstreams and the app (uvicorn subprocesses) against a
+fresh SQLite database, seeds projects through the NDJSON import endpoint,
+then drives each scenario at each concurrency level for a fixed duration
+and reports p50/p95/p99 latency and RPS as JSON.
+
+Run from backend/:
+  python bench/run_load.py --out bench/results.json
+  python bench/run_load.py --compare bench/results.json   # regression check
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import bcrypt
+import httpx
+from harness import (
+    ADMIN_PASSWORD,
+    ADMIN_USERNAME,
+    APP_DIR,
+    BENCH_DIR,
+    app_env,
+    base_env,
+    free_port,
+    seed_projects,
+    start_server,
+    stop,
+    wait_ready,
+)
+from report import compare, summarize_ms, write_results
+
+SCENARIOS = ("projects_list", "project_detail", "chat", "login")
+
+
+# --------------------------------------------------
+# SCENARIOS
+# --------------------------------------------------
+def _scenario(name: str, ids: List[int]) -> Callable:
+    counter = iter(range(10**9))
+
+    async def projects_list(client: httpx.AsyncClient):
+        return await client.get("/projects/", params={"limit": 50})
+
+    async def project_detail(client: httpx.AsyncClient):
+        return await client.get(f"/projects/{random.choice(ids)}")
+
+    async def chat(client: httpx.AsyncClient):
+        # Unique wording per request so the response cache does not hide the LLM path
+        n = next(counter)
+        return await client.post(
+            "/api/v1/chatbot/chat",
+            json={"message": f"What did you build in project {n}?", "history": []},
+        )
+
+    async def login(client: httpx.AsyncClient):
+        return await client.post(
+            "/auth/login",
+            data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+        )
+
+    return {
+        "projects_list": projects_list,
+        "project_detail": project_detail,
+        "chat": chat,
+        "login": login,
+    }[name]
+
+
+async def _run_level(
+    base_url: str, request: Callable, concurrency: int, duration: float
+) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        # warm-up: one request per worker, not recorded
+        await asyncio.gather(*(request(client) for _ in range(concurrency)))
+
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await request(client)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        **summarize_ms(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds per level"
+    )
+    parser.add_argument("--projects", type=int, default=200, help="rows to seed")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-tool-every", type=int, default=0)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="p95 regression limit"
+    )
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+
+    workdir = tempfile.mkdtemp(prefix="portfolio-bench-")
+    fake_port, app_port = free_port(), free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    password_hash = bcrypt.hashpw(
+        ADMIN_PASSWORD.encode(), bcrypt.gensalt(rounds=args.bcrypt_rounds)
+    ).decode()
+
+    fake_env = {
+        **base_env(),
+        "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+        "FAKE_LLM_TOOL_EVERY": str(args.llm_tool_every),
+    }
+
+    print(f"Workdir {workdir}; fakes on {fake_port}, app on {app_port}")
+    fake = start_server(
+        "fakes:app", fake_port, BENCH_DIR, fake_env, f"{workdir}/fakes.log"
+    )
+    app = start_server(
+        "main:app",
+        app_port,
+        APP_DIR,
+        app_env(workdir, fake_url, password_hash),
+        f"{workdir}/app.log",
+    )
+    results = []
+    try:
+        wait_ready(f"{fake_url}/_stats", fake)
+        wait_ready(f"{app_url}/health", app)
+
+        ids = seed_projects(app_url, args.projects)
+        print(f"Seeded {args.projects} projects")
+
+        for name in scenarios:
+            for concurrency in levels:
+                row = asyncio.run(
+                    _run_level(
+                        app_url, _scenario(name, ids), concurrency, args.duration
+                    )
+                )
+                row = {"scenario": name, "concurrency": concurrency, **row}
+                results.append(row)
+                print(
+                    f"{name:15s} c={concurrency:<3d} {row['rps']:>9.1f} rps  "
+                    f"p50 {row['p50_ms']:>8.2f}  p95 {row['p95_ms']:>8.2f}  "
+                    f"p99 {row['p99_ms']:>8.2f} ms  errors {row['errors']}"
+                )
+        print("Fake upstream counters:", httpx.get(f"{fake_url}/_stats").json())
+    finally:
+        stop(app, fake)
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("out", "compare")}
+    if args.compare:
+        ok = compare(
+            args.compare, results, ("scenario", "concurrency"), "p95_ms", args.threshold
+        )
+        if not ok:
+            sys.exit(1)
+    else:
+        write_results(args.out, "load", settings, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Unit tests for the backend (needs pytest on top of requirements.txt).
+Run from backend/:
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+
+APP_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"
+)
+sys.path.insert(0, APP_DIR)
@@ -0,0 +1,154 @@
+"""LLMRouter retries, fallback and circuit breaking against LocalProvider"""
+
+import asyncio
+import time
+
+import pytest
+from services.llm import (
+    CircuitBreaker,
+    DeadlineExceeded,
+    LLMRoute,
+    LLMRouter,
+    LLMUnavailable,
+    LocalProvider,
+)
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def make_router(primary, fallback=None, failures=5, max_retries=0):
+    routes = [LLMRoute(primary, "primary", CircuitBreaker(failures, 60.0))]
+    if fallback is not None:
+        routes.append(LLMRoute(fallback, "fallback", CircuitBreaker(failures, 60.0)))
+    return LLMRouter(routes, max_retries=max_retries, backoff_base=0.0)
+
+
+def content(response) -> str:
+    return response.choices[0].message.content
+
+
+def test_retries_transient_error_on_same_route():
+    primary = LocalProvider(fail_first=1)
+    router = make_router(primary, LocalProvider(), max_retries=1)
+
+    model, response = asyncio.run(router.acreate(messages=MESSAGES))
+
+    assert model == "primary"
+    assert content(response) == "[primary] You said: hello"
+    assert primary.calls == 2
+    assert router.routes[0].breaker.state == CircuitBreaker.CLOSED
+
+
+def test_falls_back_when_primary_keeps_failing():
+    primary, fallback = LocalProvider(fail_first=10), LocalProvider()
+    router = make_router(primary, fallback, max_retries=1)
+
+    model, response = asyncio.run(router.acreate(messages=MESSAGES))
+
+    assert model == "fallback"
+    assert content(response) == "[fallback] You said: hello"
+    assert primary.calls == 2
+    assert fallback.calls == 1
+
+
+def test_sync_create_falls_back_too():
+    router = make_router(LocalProvider(fail_first=10), LocalProvider())
+
+    model, response = router.create(messages=MESSAGES)
+
+    assert model == "fallback"
+    assert content(response) == "[fallback] You said: hello"
+
+
+def test_stream_falls_back_before_it_opens():
+    router = make_router(LocalProvider(fail_first=10), LocalProvider())
+
+    async def collect():
+        model, stream = await router.acreate(messages=MESSAGES, stream=True)
+        text = ""
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                text += chunk.choices[0].delta.content
+        return model, text
+
+    assert asyncio.run(collect()) == ("fallback", "[fallback] You said: hello")
+
+
+def test_circuit_opens_and_skips_primary():
+    primary, fallback = LocalProvider(fail_first=10), LocalProvider()
+    router = make_router(primary, fallback, failures=2)
+
+    for _ in range(2):
+        assert asyncio.run(router.acreate(messages=MESSAGES))[0] == "fallback"
+    assert router.routes[0].breaker.state == CircuitBreaker.OPEN
+    assert primary.calls == 2
+
+    model, _ = asyncio.run(router.acreate(messages=MESSAGES))
+    assert model == "fallback"
+    assert primary.calls == 2  # skipped, not attempted
+    assert fallback.calls == 3
+    assert router.stats()[0]["circuit"] == CircuitBreaker.OPEN
+
+
+def test_half_open_probe_closes_circuit():
+    primary = LocalProvider(fail_first=1)
+    router = make_router(primary, failures=1)
+    router.routes[0].breaker.reset_seconds = 0.0
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(router.acreate(messages=MESSAGES))
+    assert router.routes[0].breaker.state == CircuitBreaker.OPEN
+
+    model, _ = asyncio.run(router.acreate(messages=MESSAGES))
+    assert model == "primary"
+    assert router.routes[0].breaker.state == CircuitBreaker.CLOSED
+
+
+def test_all_circuits_open_raises_unavailable():
+    primary = LocalProvider()
+    router = make_router(primary, failures=1)
+    router.routes[0].breaker.record_failure()
+
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(router.acreate(messages=MESSAGES))
+    assert primary.calls == 0
+
+
+def test_last_error_is_raised_when_every_route_fails():
+    router = make_router(LocalProvider(fail_first=10), LocalProvider(fail_first=10))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(router.acreate(messages=MESSAGES))
+
+
+def test_non_transient_error_is_not_retried_or_routed_around():
+    class Rejecting(LocalProvider):
+        async def acreate(self, model, timeout, **kwargs):
+            self.calls += 1
+            raise ValueError("bad request")
+
+    primary, fallback = Rejecting(), LocalProvider()
+    router = make_router(primary, fallback, max_retries=2)
+
+    with pytest.raises(ValueError):
+        asyncio.run(router.acreate(messages=MESSAGES))
+    assert primary.calls == 1
+    assert fallback.calls == 0
+    assert router.routes[0].breaker.state == CircuitBreaker.CLOSED
+
+
+def test_expired_deadline_raises_before_calling_upstream():
+    primary = LocalProvider()
+    router = make_router(primary)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(router.acreate(deadline=time.monotonic() - 1, messages=MESSAGES))
+    assert primary.calls == 0
+
+
+def test_slow_upstream_times_out_and_falls_back():
+    router = make_router(LocalProvider(latency=1.0), LocalProvider())
+    router.request_timeout = 0.05
+
+    model, _ = asyncio.run(router.acreate(messages=MESSAGES))
+    assert model == "fallback"
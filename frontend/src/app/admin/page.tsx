@@ -4,7 +4,12 @@ import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import { isLoggedIn } from "@/src/lib/auth";
 import { projects } from "@/src/lib/api";
-import { Project, ProjectCreate, ProjectUpdate } from "@/src/types";
+import {
+  Project,
+  ProjectCreate,
+  ProjectSummary,
+  ProjectUpdate,
+} from "@/src/types";
 import { Input, Textarea } from "@/src/components/ui/Input";
 import Button from "@/src/components/ui/Button";
 import { Plus, Edit, Trash2, Save, Shield } from "lucide-react";
@@ -14,7 +19,7 @@ export default function AdminPanelPage() {
   const [activeTab, setActiveTab] =
     useState<"create" | "edit" | "delete">("create");
 
-  const [projectList, setProjectList] = useState<Project[]>([]);
+  const [projectList, setProjectList] = useState<ProjectSummary[]>([]);
   const [loading, setLoading] = useState(false);
   const [message, setMessage] = useState("");
 
@@ -39,7 +44,7 @@ export default function AdminPanelPage() {
 
   const fetchProjects = async () => {
     try {
-      const res = await projects.getAll();
+      const res = await projects.getAllLive();
       setProjectList(res.data);
     } catch {
       console.error("Failed to fetch projects");
@@ -102,7 +107,15 @@ export default function AdminPanelPage() {
     }
   };
 
-  const loadProjectForEdit = (project: Project) => {
+  const loadProjectForEdit = async (summary: ProjectSummary) => {
+    // The list only carries summaries; fetch the full record for editing
+    let project: Project;
+    try {
+      project = (await projects.getByIdLive(summary.id)).data;
+    } catch {
+      setMessage("Failed to load project");
+      return;
+    }
     setSelectedProject(project);
     setEditForm({
       title: project.title,
@@ -2,12 +2,12 @@
 
 import { useEffect, useState, useMemo } from "react";
 import { projects } from "@/src/lib/api";
-import { Project } from "@/src/types";
+import { ProjectSummary } from "@/src/types";
 import ProjectCard from "@/src/components/ProjectCard";
 import { Loader2, Search, X } from "lucide-react";
 
 export default function ProjectsPage() {
-  const [projectList, setProjectList] = useState<Project[]>([]);
+  const [projectList, setProjectList] = useState<ProjectSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
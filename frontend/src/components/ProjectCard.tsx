@@ -1,9 +1,9 @@
 import Link from "next/link";
-import { Project } from "@/src/types";
+import { ProjectSummary } from "@/src/types";
 import { Github, ExternalLink, ArrowRight } from "lucide-react";
 
 interface ProjectCardProps {
-  project: Project;
+  project: ProjectSummary;
 }
 
 export default function ProjectCard({ project }: ProjectCardProps) {
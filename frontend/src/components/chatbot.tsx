@@ -1,6 +1,7 @@
 "use client";
 
 import { useState, useRef, useEffect } from "react";
+import axios from "axios";
 import { chatbot } from "../lib/api";
 
 interface Message {
@@ -18,6 +19,8 @@ export default function Chatbot() {
   ]);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  // Server-side conversation; later turns send only the new message
+  const sessionIdRef = useRef<string | null>(null);
 
   const scrollContainerRef = useRef<HTMLDivElement>(null);
 
@@ -44,7 +47,22 @@ export default function Chatbot() {
     setIsLoading(true);
 
     try {
-      const response = await chatbot.chat(input, messages);
+      let response;
+      try {
+        response = await chatbot.chat(input, messages, sessionIdRef.current);
+      } catch (error) {
+        // Session expired or evicted: start a new one from the local history
+        if (
+          !sessionIdRef.current ||
+          !axios.isAxiosError(error) ||
+          error.response?.status !== 404
+        ) {
+          throw error;
+        }
+        sessionIdRef.current = null;
+        response = await chatbot.chat(input, messages);
+      }
+      sessionIdRef.current = response.data.session_id ?? null;
 
       const assistantMessage: Message = {
         role: "assistant",
@@ -54,12 +72,15 @@ export default function Chatbot() {
       setMessages((prev) => [...prev, assistantMessage]);
     } catch (error) {
       console.error("Chat error:", error);
+      const busy =
+        axios.isAxiosError(error) && error.response?.status === 429;
       setMessages((prev) => [
         ...prev,
         {
           role: "assistant",
-          content:
-            "Sorry about that! I hit a snag. Could you try asking that again?",
+          content: busy
+            ? "I'm answering a lot of questions right now. Please try again in a few seconds."
+            : "Sorry about that! I hit a snag. Could you try asking that again?",
         },
       ]);
     } finally {
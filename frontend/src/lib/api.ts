@@ -1,12 +1,17 @@
 import axios from "axios";
 import {
   Project,
+  ProjectSummary,
   ProjectCreate,
   ProjectUpdate,
   LoginCredentials,
+  ChatMessage,
+  ChatResponse,
 } from "../types";
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+// Optional CDN origin for the static catalog (backend/app/export_snapshot.py)
+const SNAPSHOT_URL = process.env.NEXT_PUBLIC_SNAPSHOT_URL;
 
 const api = axios.create({
   baseURL: API_URL,
@@ -37,9 +42,64 @@ export const auth = {
   },
 };
 
+// GET /projects/ is keyset-paginated; the next page's cursor comes back in
+// the X-Next-Cursor header.
+const getAllProjectSummaries = async () => {
+  const data: ProjectSummary[] = [];
+  let cursor: string | undefined;
+
+  do {
+    const res = await api.get<ProjectSummary[]>("/projects/", {
+      params: { limit: 100, cursor },
+    });
+    data.push(...res.data);
+    cursor = res.headers["x-next-cursor"] as string | undefined;
+  } while (cursor);
+
+  return { data };
+};
+
+// manifest.json is the only mutable snapshot file; it names the immutable
+// versioned directory holding index.json and projects/<id>.json.
+const getSnapshotPath = async () => {
+  const res = await axios.get<{ path: string }>(
+    `${SNAPSHOT_URL}/manifest.json`,
+    { params: { t: Date.now() } },
+  );
+  return `${SNAPSHOT_URL}/${res.data.path}`;
+};
+
+// Reads from the snapshot when configured, falling back to the API
+const getAllProjects = async () => {
+  if (SNAPSHOT_URL) {
+    try {
+      const base = await getSnapshotPath();
+      return await axios.get<ProjectSummary[]>(`${base}/index.json`);
+    } catch {
+      // fall through to the API
+    }
+  }
+  return getAllProjectSummaries();
+};
+
+const getProjectById = async (id: number) => {
+  if (SNAPSHOT_URL) {
+    try {
+      const base = await getSnapshotPath();
+      return await axios.get<Project>(`${base}/projects/${id}.json`);
+    } catch {
+      // fall through to the API
+    }
+  }
+  return api.get<Project>(`/projects/${id}`);
+};
+
 export const projects = {
-  getAll: () => api.get<Project[]>("/projects/"),
-  getById: (id: number) => api.get<Project>(`/projects/${id}`),
+  getAll: getAllProjects,
+  getById: getProjectById,
+  // Admin views read straight from the API: the snapshot lags writes
+  getAllLive: getAllProjectSummaries,
+  getByIdLive: (id: number) => api.get<Project>(`/projects/${id}`),
   create: (data: ProjectCreate) => api.post<Project>("/projects/", data),
   update: (id: number, data: ProjectUpdate) =>
     api.patch<Project>(`/projects/${id}`, data),
@@ -47,12 +107,18 @@ export const projects = {
 };
 
 export const chatbot = {
-  chat: (message: string, history: { role: string; content: string }[]) =>
+  // With a session only the new message is sent; the server keeps the history.
+  // Without one, the history seeds a new session (the response has its id).
+  chat: (message: string, history: ChatMessage[], sessionId?: string | null) =>
     // Matches Backend: prefix="/api/v1/chatbot" + endpoint="/chat"
-    api.post(API_URL + "/api/v1/chatbot/chat", {
-      message,
-      history,
-    }),
+    api.post<ChatResponse>(
+      API_URL + "/api/v1/chatbot/chat",
+      sessionId
+        ? { message, session_id: sessionId }
+        : { message, history, new_session: true },
+    ),
+  endSession: (sessionId: string) =>
+    api.delete(`${API_URL}/api/v1/chatbot/sessions/${sessionId}`),
 };
 
 export default api;
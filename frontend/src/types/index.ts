@@ -15,6 +15,18 @@ export interface Project {
   future_improvements?: string;
 }
 
+// List-page projection returned by GET /projects/ (no long-text fields)
+export type ProjectSummary = Pick<
+  Project,
+  | "id"
+  | "title"
+  | "short_description"
+  | "tech_stack"
+  | "github_url"
+  | "live_url"
+  | "created_at"
+>;
+
 export interface ProjectCreate {
   title: string;
   short_description: string;
@@ -42,3 +54,14 @@ export interface LoginCredentials {
   username: string;
   password: string;
 }
+
+export interface ChatMessage {
+  role: string;
+  content: string;
+}
+
+export interface ChatResponse {
+  response: string;
+  model: string;
+  session_id?: string | null;
+}